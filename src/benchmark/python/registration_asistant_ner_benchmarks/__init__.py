@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable
+
+from registration_asistant_ner_benchmarks.benchmarks import SkipBenchmark
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+
+def get_commit() -> str:
+    """
+    Get the current git commit, so results can be compared between commits. Git runs in the directory of the
+    benchmarks, so the commit is found wherever the benchmarks are run from.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def measure(func: Callable, rounds: int, warmup: int = 1) -> list[float]:
+    """
+    Time `func` for the given number of rounds, after running it `warmup` times untimed.
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def load_results(results_file: Path) -> list[dict]:
+    if not os.path.exists(results_file):
+        return []
+    with open(results_file, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(results: list[dict], history: list[dict], threshold: float) -> list[str]:
+    """
+    Compare each result with the latest result of the same benchmark and size recorded for a different commit.
+    A benchmark regresses when its median time grows more than `threshold` (0.1 = 10%).
+    """
+    regressions = []
+    for result in results:
+        previous = [r for r in history if r['benchmark'] == result['benchmark'] and r['size'] == result['size']
+                    and r['commit'] != result['commit']]
+        if not previous:
+            continue
+        baseline = previous[-1]
+        change = result['median'] / baseline['median'] - 1
+        logger.info(f"{result['benchmark']}: {change:+.1%} against commit {baseline['commit']}.")
+        if change > threshold:
+            regressions.append(f"{result['benchmark']} is {change:.1%} slower than in commit {baseline['commit']} "
+                               f"({baseline['median']:.4f}s -> {result['median']:.4f}s)")
+    return regressions
+
+
+def run_benchmarks(
+        benchmarks: dict[str, Callable],
+        results_file: Path,
+        size: int = 100,
+        rounds: int = 5,
+        select: str = '*',
+        threshold: float = 0.1
+) -> tuple[list[str], list[str]]:
+    """
+    Run the benchmarks whose name matches `select`, append the timings to `results_file` and report the ones that
+    regressed against a previous commit. Benchmarks whose setup raises `SkipBenchmark` (e.g. a missing model or
+    Tesseract binary) are skipped; any other error, in the setup or in the timed function, is a failure.
+
+    :return: List with a description of each regression found and list with a description of each failure.
+    """
+    commit = get_commit()
+    history = load_results(results_file)
+    results = []
+    failures = []
+
+    for name, benchmark in benchmarks.items():
+        if not fnmatch(name, select):
+            continue
+        with tempfile.TemporaryDirectory() as workdir:
+            try:
+                func, items = benchmark(Path(workdir), size)
+            except SkipBenchmark as e:
+                logger.warning(f"Skipping benchmark '{name}': {e}")
+                continue
+            except Exception as e:
+                logger.exception(f"Benchmark '{name}' failed during setup.")
+                failures.append(f"{name} failed during setup: {e!r}")
+                continue
+            try:
+                timings = measure(func, rounds)
+            except Exception as e:
+                logger.exception(f"Benchmark '{name}' failed.")
+                failures.append(f"{name} failed: {e!r}")
+                continue
+
+        result = {
+            'benchmark': name,
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'size': size,
+            'items': items,
+            'rounds': rounds,
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.mean(timings),
+            'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        }
+        logger.info(f"{name}: median {result['median']:.4f}s for {items} items "
+                    f"({items / result['median']:.1f} items/sec).")
+        results.append(result)
+
+    with open(results_file, "a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+    regressions = find_regressions(results, history, threshold)
+    for regression in regressions:
+        logger.warning(f"Regression: {regression}")
+    return regressions, failures
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from registration_asistant_ner_benchmarks.benchmarks import get_benchmarks
+
+    parser = argparse.ArgumentParser(description="Benchmark the data and inference pipeline.")
+    parser.add_argument('--select', type=str, default='*',
+                        help="Glob pattern with the benchmarks to run, e.g. 'inference*'. Default runs all of them.")
+    parser.add_argument('--size', type=int, default=100, help="Number of synthetic records (or test docs) to use.")
+    parser.add_argument('--rounds', type=int, default=5, help="Number of timed rounds for each benchmark.")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Relative slowdown of the median time reported as a regression. Default is 0.1 (10%%).")
+    parser.add_argument('--results_file', type=Path, default=Path(os.getcwd()) / "benchmark_results.jsonl",
+                        help="JSONL file where the results are appended.")
+    parser.add_argument('--models_path', type=Path, default=Path(os.getcwd()) / "trained_models",
+                        help="Path to the trained models.")
+    parser.add_argument('--test_data_path', type=Path, default=Path(os.getcwd()) / "training_data",
+                        help="Path to the '*_test.spacy' files.")
+    parser.add_argument('--fail_on_regression', action='store_true',
+                        help="Exit with an error code if a regression is found.")
+
+    args = parser.parse_args()
+
+    found_regressions, found_failures = run_benchmarks(
+        benchmarks=get_benchmarks(args.models_path, args.test_data_path),
+        results_file=args.results_file,
+        size=args.size,
+        rounds=args.rounds,
+        select=args.select,
+        threshold=args.threshold
+    )
+
+    # A benchmark that fails is always an error, it may be hiding a regression
+    if found_failures or (found_regressions and args.fail_on_regression):
+        sys.exit(1)
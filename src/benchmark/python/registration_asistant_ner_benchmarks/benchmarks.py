@@ -0,0 +1,116 @@
+import random
+from pathlib import Path
+from typing import Callable
+
+from spacy.tokens import DocBin
+
+from registration_asistant_ner_benchmarks.synthetic import generate_scraped_data, generate_cover_page_pdf, \
+    cover_page_lines, random_record
+
+MODEL_NAMES = ['title', 'authors', 'year', 'advisors', 'faculty', 'program']
+
+
+class SkipBenchmark(Exception):
+    """
+    Raised by the setup of a benchmark when it can't run in the current environment (e.g. a missing model or
+    Tesseract binary). Any other exception is reported as a failure.
+    """
+
+
+def load_synthetic_data(workdir: Path, size: int):
+    """
+    Build a DataFrame shaped like the output of `load_scraped_data` from a synthetic scrape, without running OCR
+    (the cover page text is taken from the lines printed on the synthetic PDF).
+    """
+    import pandas as pd
+    from registration_asistant_ner.training_data.data_loader import get_file_path, parse_xml
+
+    files_path = workdir / "files"
+    records = generate_scraped_data(workdir / "index.jsonl", files_path, size, with_pdf=False)
+    index_df = pd.read_json(workdir / "index.jsonl", lines=True)
+    index_df['xml_file'] = index_df['files'].apply(lambda x: get_file_path(files_path, x, '.xml'))
+    index_df['pdf_file'] = None
+    index_df = index_df.join(index_df['xml_file'].apply(parse_xml).apply(pd.Series))
+    index_df['cover_page_text'] = ["\n".join(cover_page_lines(record)) for record in records]
+    return index_df
+
+
+def bench_parse_xml(workdir: Path, size: int) -> tuple[Callable, int]:
+    from registration_asistant_ner.training_data.data_loader import get_file_path, parse_xml
+    import json
+
+    files_path = workdir / "files"
+    generate_scraped_data(workdir / "index.jsonl", files_path, size, with_pdf=False)
+    with open(workdir / "index.jsonl", encoding="utf-8") as index:
+        xml_files = [get_file_path(files_path, json.loads(line)['files'], '.xml') for line in index]
+
+    return lambda: [parse_xml(xml_file) for xml_file in xml_files], len(xml_files)
+
+
+def bench_prepare_data(workdir: Path, size: int) -> tuple[Callable, int]:
+    from registration_asistant_ner.training_data.data_preparer import prepare_data
+
+    data = load_synthetic_data(workdir, size)
+    return lambda: prepare_data(data.copy()), len(data)
+
+
+def bench_generate_doc_with_entities(workdir: Path, size: int) -> tuple[Callable, int]:
+    from registration_asistant_ner.training_data.data_preparer import prepare_data, generate_doc_with_entities
+
+    rows = prepare_data(load_synthetic_data(workdir, size)).to_dict(orient='records')
+    columns = ['authors', 'advisors', 'year', 'faculty', 'program', 'title']
+    return lambda: [generate_doc_with_entities(row, 'cover_page_text', columns) for row in rows], len(rows)
+
+
+def bench_get_text_from_page(workdir: Path, size: int) -> tuple[Callable, int]:
+    import pytesseract
+    from registration_asistant_ner.training_data.pdf_reader import get_text_from_page
+
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError as e:
+        raise SkipBenchmark(e)
+
+    # OCR is orders of magnitude slower than the rest of the pipeline, only a handful of pages is timed
+    rng = random.Random(0)
+    pdf_files = []
+    for i in range(min(size, 3)):
+        pdf_file = workdir / f"cover_{i}.pdf"
+        pdf_file.write_bytes(generate_cover_page_pdf(cover_page_lines(random_record(rng, i))))
+        pdf_files.append(str(pdf_file))
+
+    return lambda: [get_text_from_page(pdf_file, 0) for pdf_file in pdf_files], len(pdf_files)
+
+
+def bench_model_inference(model_name: str, models_path: Path, test_data_path: Path) -> Callable:
+    def bench(workdir: Path, size: int) -> tuple[Callable, int]:
+        import spacy
+
+        model_path = models_path / f"{model_name}_ner_model" / "model-best"
+        test_data_file = test_data_path / f"{model_name}_test.spacy"
+        for path in (model_path, test_data_file):
+            if not path.exists():
+                raise SkipBenchmark(f"'{path}' not found.")
+
+        nlp = spacy.load(model_path)
+        docs = DocBin().from_disk(test_data_file).get_docs(nlp.vocab)
+        texts = [doc.text for _, doc in zip(range(size), docs)]
+        return lambda: list(nlp.pipe(texts)), len(texts)
+
+    return bench
+
+
+def get_benchmarks(models_path: Path, test_data_path: Path) -> dict[str, Callable]:
+    """
+    Get the available benchmarks. Each benchmark receives a scratch directory and the size of the synthetic workload,
+    and returns the function to time together with the number of items it processes on every call.
+    """
+    benchmarks = {
+        'parse_xml': bench_parse_xml,
+        'prepare_data': bench_prepare_data,
+        'generate_doc_with_entities': bench_generate_doc_with_entities,
+        'get_text_from_page': bench_get_text_from_page,
+    }
+    for model_name in MODEL_NAMES:
+        benchmarks[f'inference[{model_name}]'] = bench_model_inference(model_name, models_path, test_data_path)
+    return benchmarks
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import random
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import pymupdf
+
+FIRST_NAMES = ['Juan', 'Maria', 'Jose', 'Ana', 'Luis', 'Carmen', 'Jorge', 'Rosa', 'Carlos', 'Elena', 'Mario', 'Lucia']
+LAST_NAMES = ['Mamani', 'Quispe', 'Choque', 'Condori', 'Flores', 'Gutiérrez', 'Rodríguez', 'Huanca', 'Limachi',
+              'Vargas', 'Ticona', 'Apaza', 'Céspedes', 'Patiño']
+TITLE_WORDS = ['Análisis', 'Sistema', 'Propuesta', 'Implementación', 'Evaluación', 'Gestión', 'Modelo', 'Impacto',
+               'Desarrollo', 'Información', 'Control', 'Municipio', 'Región', 'Altiplano', 'Educación']
+BREADCRUMBS = [
+    ['DSpace Home', 'Facultad de Tecnología', 'Carrera Electrónica y Telecomunicaciones', 'Proyectos de Grado'],
+    ['DSpace Home', 'Facultad de Ciencias Puras y Naturales', 'Carrera Informática', 'Tesis de Grado'],
+    ['DSpace Home', 'Facultad de Derecho y Ciencias Políticas', 'Carrera de Derecho', 'Trabajos Dirigidos'],
+    ['DSpace Home', 'Facultad de Ciencias Económicas y Financieras', 'Carrera Contaduría Pública', 'Tesis de Grado'],
+    ['DSpace Home', 'Área Vicerrectorado', 'Biblioteca Universitaria Central', 'Folletería'],
+]
+
+METS_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<mets:METS xmlns:mets="http://www.loc.gov/METS/" xmlns:xlink="http://www.w3.org/TR/xlink/" xmlns:dim="http://www.dspace.org/xmlns/dspace/dim" PROFILE="DSPACE METS SIP Profile 1.0" LABEL="DSpace Item" OBJID="/xmlui/handle/123456789/{handle}" ID="hdl:123456789/{handle}">
+<mets:dmdSec GROUPID="group_dmd_0" ID="dmd_1">
+<mets:mdWrap OTHERMDTYPE="DIM" MDTYPE="OTHER">
+<mets:xmlData>
+<dim:dim dspaceType="ITEM">
+{fields}
+</dim:dim>
+</mets:xmlData>
+</mets:mdWrap>
+</mets:dmdSec>
+<mets:fileSec>
+<mets:fileGrp USE="CONTENT">
+<mets:file MIMETYPE="application/pdf" ID="file_{handle}">
+<mets:FLocat LOCTYPE="URL" xlink:href="/xmlui/bitstream/handle/123456789/{handle}/tesis.pdf?sequence=1&amp;isAllowed=y"/>
+</mets:file>
+</mets:fileGrp>
+</mets:fileSec>
+</mets:METS>
+"""
+
+
+def random_name(rng: random.Random) -> str:
+    """
+    Generate a name in the 'Last Last, First' form used by DSpace.
+    """
+    return f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}"
+
+
+def random_title(rng: random.Random) -> str:
+    return " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(4, 10)))
+
+
+def random_record(rng: random.Random, handle: int) -> dict:
+    """
+    Generate the metadata of a single synthetic thesis.
+    """
+    return {
+        'handle': handle,
+        'title': random_title(rng),
+        'abstract': " ".join(rng.choice(TITLE_WORDS).lower() for _ in range(rng.randint(40, 120))),
+        'subjects': [rng.choice(TITLE_WORDS).upper() for _ in range(rng.randint(1, 5))],
+        'authors': [random_name(rng) for _ in range(rng.randint(1, 2))],
+        'advisors': [random_name(rng) for _ in range(rng.randint(0, 2))],
+        'issued': str(rng.randint(2000, 2024)),
+        'breadcrumb': rng.choice(BREADCRUMBS) + ['View Item'],
+    }
+
+
+def generate_mets_xml(record: dict) -> str:
+    """
+    Render a METS document with the same `dim:field` layout as the ones harvested from DSpace.
+    """
+    fields = [('title', None, record['title']), ('description', 'abstract', record['abstract'])]
+    fields += [('subject', None, value) for value in record['subjects']]
+    fields += [('contributor', 'author', value) for value in record['authors']]
+    fields += [('contributor', 'advisor', value) for value in record['advisors']]
+    fields += [('date', 'issued', record['issued'])]
+
+    lines = []
+    for element, qualifier, value in fields:
+        qualifier_attribute = f' qualifier="{qualifier}"' if qualifier else ''
+        lines.append(f'<dim:field{qualifier_attribute} mdschema="dc" element="{element}">{escape(value)}</dim:field>')
+    return METS_TEMPLATE.format(handle=record['handle'], fields="\n".join(lines))
+
+
+def cover_page_lines(record: dict) -> list[str]:
+    """
+    Build the lines of text printed on the cover page of a synthetic thesis.
+    """
+    faculty, program = record['breadcrumb'][1], record['breadcrumb'][2]
+    lines = ['UNIVERSIDAD MAYOR DE SAN ANDRÉS', faculty.upper(), program.upper(), '', record['breadcrumb'][3].upper(), '']
+    lines += [record['title'].upper(), '']
+    lines += ['POSTULANTE: ' + " ".join(reversed(name.split(", "))) for name in record['authors']]
+    lines += ['TUTOR: ' + " ".join(reversed(name.split(", "))) for name in record['advisors']]
+    lines += ['', 'LA PAZ - BOLIVIA', record['issued']]
+    return lines
+
+
+def generate_cover_page_pdf(lines: list[str], pages: int = 1) -> bytes:
+    """
+    Render a PDF whose first page looks like a thesis cover: a filled block standing in for the university logo
+    (so `remove_logos_from_page` has work to do) followed by the given lines of text.
+    """
+    doc = pymupdf.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        page.draw_rect(pymupdf.Rect(250, 40, 350, 140), color=(0, 0, 0), fill=(0, 0, 0))
+        text_lines = lines if page_number == 0 else [f"PAGINA {page_number + 1}"] + lines[6:8]
+        y = 180
+        for line in text_lines:
+            page.insert_text((60, y), line, fontsize=12)
+            y += 20
+    pdf = doc.tobytes()
+    doc.close()
+    return pdf
+
+
+def generate_scraped_data(index_file: Path, files_path: Path, size: int, seed: int = 0,
+                          with_pdf: bool = True) -> list[dict]:
+    """
+    Write a synthetic scrape to disk: an index JSONL file with the same layout the spider and FilesPipeline produce,
+    plus the METS XML and (optionally) cover page PDF referenced from it under `files_path`.
+
+    :return: The synthetic records used to generate the files, so callers can check what should be extracted.
+    """
+    rng = random.Random(seed)
+    (Path(files_path) / "full").mkdir(parents=True, exist_ok=True)
+
+    records = []
+    with open(index_file, "w", encoding="utf-8") as index:
+        for i in range(size):
+            record = random_record(rng, 10000 + i)
+            base_url = f"https://repositorio.umsa.bo/xmlui/bitstream/handle/123456789/{record['handle']}"
+            contents = [(f"{base_url}/tesis.pdf?sequence=1&isAllowed=y", ".pdf",
+                         generate_cover_page_pdf(cover_page_lines(record)) if with_pdf else None),
+                        (f"https://repositorio.umsa.bo/xmlui/metadata/handle/123456789/{record['handle']}/mets.xml",
+                         ".xml", generate_mets_xml(record).encode("utf-8"))]
+
+            files = []
+            for url, extension, content in contents:
+                if content is None:
+                    continue
+                path = f"full/{hashlib.sha1(url.encode('utf-8')).hexdigest()}{extension}"
+                (Path(files_path) / path).write_bytes(content)
+                files.append({'url': url, 'path': path, 'checksum': hashlib.md5(content).hexdigest(),
+                              'status': 'downloaded'})
+
+            index.write(json.dumps({
+                'community_page': 'https://repositorio.umsa.bo/xmlui/handle/123456789/17064/recent-submissions',
+                'document_page': f"https://repositorio.umsa.bo/xmlui/handle/123456789/{record['handle']}",
+                'breadcrumb': record['breadcrumb'],
+                'file_urls': [file['url'] for file in files],
+                'files': files,
+            }) + "\n")
+            records.append(record)
+    return records
@@ -0,0 +1,175 @@
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+import spacy
+import srsly
+from spacy.language import Language
+from spacy.tokens import DocBin
+from spacy.vocab import Vocab
+
+from registration_asistant_ner.evaluate import MODEL_NAMES
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+BUNDLE_META_FILE = "bundle.json"
+
+
+def get_required_strings(nlp: Language) -> set[str]:
+    """
+    Get the strings a model needs in its StringStore to produce the same predictions.
+
+    The hash embeddings of the tok2vec layer hash the token attributes (NORM, PREFIX, SUFFIX, SHAPE) from the token
+    text at runtime, so the strings collected while training (one per token seen) are not needed to predict. Only the
+    default strings of the language and the labels of the components are kept; the NER moves and the tokenizer
+    special cases add their own strings back when they are loaded.
+    """
+    strings = set(spacy.blank(nlp.lang).vocab.strings)
+    for _, pipe in nlp.pipeline:
+        strings.update(getattr(pipe, 'labels', ()))
+    return strings
+
+
+def compact_models(
+        models_path: Path,
+        bundle_path: Path,
+        model_names: list[str] = MODEL_NAMES,
+        model_variant: str = 'model-best',
+        overwrite: bool = False
+) -> None:
+    """
+    Package one variant of each trained model into a bundle that shares a single pruned vocab.
+
+    The bundle has a `vocab` directory with the union of the strings required by every model, and one directory for
+    each model serialized without its vocab. Use `load_bundle` to load it.
+
+    A previous bundle in `bundle_path` is replaced. Any other non-empty directory (e.g. the trained models, given by
+    mistake) is only deleted and replaced if `overwrite` is True, otherwise a FileExistsError is raised.
+    """
+    if os.path.exists(bundle_path):
+        if not os.path.isdir(bundle_path):
+            raise FileExistsError(f"'{bundle_path}' exists and is not a directory.")
+        is_bundle = os.path.exists(bundle_path / BUNDLE_META_FILE)
+        if os.listdir(bundle_path) and not is_bundle and not overwrite:
+            raise FileExistsError(f"'{bundle_path}' is not empty and is not a bundle. Use overwrite to replace it.")
+        shutil.rmtree(bundle_path)
+    os.makedirs(bundle_path)
+
+    lang = None
+    strings = set()
+    for model_name in model_names:
+        model_path = models_path / f"{model_name}_ner_model" / model_variant
+        nlp = spacy.load(model_path)
+        if lang is not None and nlp.lang != lang:
+            raise ValueError(f"Model '{model_path}' is for language '{nlp.lang}', expected '{lang}'.")
+        lang = nlp.lang
+
+        required_strings = get_required_strings(nlp)
+        logger.info(f"{model_name}: keeping {len(required_strings)} of {len(nlp.vocab.strings)} strings.")
+        strings.update(required_strings)
+
+        nlp.to_disk(bundle_path / model_name, exclude=['vocab'])
+
+    vocab = spacy.blank(lang).vocab
+    for string in sorted(strings):
+        vocab.strings.add(string)
+    vocab.to_disk(bundle_path / "vocab")
+
+    srsly.write_json(bundle_path / BUNDLE_META_FILE, {
+        'lang': lang,
+        'models': model_names,
+        'model_variant': model_variant,
+    })
+    logger.info(f"Saved bundle with {len(model_names)} models and {len(strings)} shared strings to '{bundle_path}'.")
+
+
+def load_bundle(bundle_path: Path, model_names: list[str] | None = None) -> dict[str, Language]:
+    """
+    Load the models of a bundle created with `compact_models`. All the models share the same Vocab.
+
+    :param bundle_path: Path to the bundle.
+    :param model_names: Models to load. Default loads all the models in the bundle.
+    :return: Dictionary with the loaded model for each name.
+    """
+    meta = srsly.read_json(bundle_path / BUNDLE_META_FILE)
+    vocab: Vocab = spacy.blank(meta['lang']).vocab.from_disk(bundle_path / "vocab")
+    return {model_name: spacy.load(bundle_path / model_name, vocab=vocab)
+            for model_name in (model_names or meta['models'])}
+
+
+def verify_bundle(
+        models_path: Path,
+        bundle_path: Path,
+        test_data_path: Path,
+        batch_size: int = 64
+) -> dict[str, int]:
+    """
+    Check that the bundled models predict the same entities as the original ones over the test data.
+
+    :return: Dictionary with the number of test docs with different predictions for each model.
+    """
+    meta = srsly.read_json(bundle_path / BUNDLE_META_FILE)
+    bundle = load_bundle(bundle_path)
+
+    mismatches = {}
+    for model_name, bundled_nlp in bundle.items():
+        original_nlp = spacy.load(models_path / f"{model_name}_ner_model" / meta['model_variant'])
+        docs = DocBin().from_disk(test_data_path / f"{model_name}_test.spacy").get_docs(original_nlp.vocab)
+        texts = [doc.text for doc in docs]
+
+        original_docs = original_nlp.pipe(texts, batch_size=batch_size)
+        bundled_docs = bundled_nlp.pipe(texts, batch_size=batch_size)
+        mismatches[model_name] = sum(
+            [(ent.start_char, ent.end_char, ent.label_) for ent in original.ents] !=
+            [(ent.start_char, ent.end_char, ent.label_) for ent in bundled.ents]
+            for original, bundled in zip(original_docs, bundled_docs)
+        )
+        logger.info(f"{model_name}: {mismatches[model_name]} of {len(texts)} test docs with different predictions.")
+
+    return mismatches
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Package the trained models into a compact bundle.")
+    parser.add_argument('bundle_path', type=Path, help="Path where the bundle is saved.")
+    parser.add_argument('--models', type=str, nargs='+', default=MODEL_NAMES,
+                        help=f"Models to include in the bundle. Default is {MODEL_NAMES}.")
+    parser.add_argument('--models_path', type=Path, default=Path(os.getcwd()) / "trained_models",
+                        help="Path to the trained models.")
+    parser.add_argument('--model_variant', type=str, default='model-best',
+                        help="Variant of the models to package, e.g. 'model-best' or 'model-last'.")
+    parser.add_argument('--test_data_path', type=Path, default=Path(os.getcwd()) / "training_data",
+                        help="Path to the '*_test.spacy' files used to verify the bundle.")
+    parser.add_argument('--skip_verify', action='store_true',
+                        help="Don't check that the bundled models predict the same as the original ones.")
+    parser.add_argument('--overwrite', action='store_true',
+                        help="Replace the contents of bundle_path even if it is not empty and is not a bundle.")
+
+    args = parser.parse_args()
+
+    if not all(model in MODEL_NAMES for model in args.models):
+        raise ValueError(f"Invalid model. Valid values are {MODEL_NAMES}.")
+
+    compact_models(args.models_path, args.bundle_path, args.models, args.model_variant, args.overwrite)
+
+    start = time.perf_counter()
+    for name in args.models:
+        spacy.load(args.models_path / f"{name}_ner_model" / args.model_variant)
+    logger.info(f"Loaded the original models in {time.perf_counter() - start:.2f}s.")
+    start = time.perf_counter()
+    load_bundle(args.bundle_path)
+    logger.info(f"Loaded the bundle in {time.perf_counter() - start:.2f}s.")
+
+    if not args.skip_verify and any(verify_bundle(args.models_path, args.bundle_path, args.test_data_path).values()):
+        logger.error("The bundled models don't predict the same entities as the original ones.")
+        sys.exit(1)
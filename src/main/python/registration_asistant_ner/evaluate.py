@@ -0,0 +1,187 @@
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+import spacy
+from spacy.language import Language
+from spacy.scorer import PRFScore
+from spacy.tokens import DocBin
+from spacy.tokens.doc import Doc
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+MODEL_NAMES = ['title', 'authors', 'year', 'advisors', 'faculty', 'program']
+
+
+def get_peak_memory() -> int | None:
+    """
+    Get the peak resident memory in bytes of this process and its (finished) children, or None if it can't be
+    measured on this platform. It is a high-water mark: it never goes down during the life of the process.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    # On Linux, the ru_maxrss of a process started with fork and exec (e.g. by the 'spawn' start method) starts at
+    # the peak memory of its parent. VmHWM is reset by exec, so it only counts the memory of this process
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    peak_memory = int(line.split()[1]) * 1024
+    return max(peak_memory, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit)
+
+
+def evaluate_model(nlp: Language, docs: Iterable[Doc], batch_size: int = 64, n_process: int = 1) -> dict:
+    """
+    Run the model over the text of the reference docs and compare the predicted entities with the reference ones.
+    The docs are streamed through `nlp.pipe`, so only the docs of the current batch are kept in memory.
+
+    :param nlp: Model to evaluate.
+    :param docs: Reference docs with the expected entities.
+    :param batch_size: Number of docs processed together by `nlp.pipe`.
+    :param n_process: Number of processes used by `nlp.pipe`.
+    :return: Dictionary with the overall and per-label precision, recall and F1, and the throughput.
+    """
+    scores: dict[str, PRFScore] = defaultdict(PRFScore)
+    n_docs = 0
+    n_tokens = 0
+
+    start = time.perf_counter()
+    texts = ((doc.text, doc) for doc in docs)
+    for predicted, reference in nlp.pipe(texts, as_tuples=True, batch_size=batch_size, n_process=n_process):
+        n_docs += 1
+        n_tokens += len(predicted)
+
+        predicted_ents = {(ent.start_char, ent.end_char, ent.label_) for ent in predicted.ents}
+        reference_ents = {(ent.start_char, ent.end_char, ent.label_) for ent in reference.ents}
+        for label in {ent[2] for ent in predicted_ents | reference_ents}:
+            scores[label].score_set({ent for ent in predicted_ents if ent[2] == label},
+                                    {ent for ent in reference_ents if ent[2] == label})
+    elapsed = time.perf_counter() - start
+
+    total = PRFScore()
+    for score in scores.values():
+        total += score
+
+    return {
+        'ents_p': total.precision,
+        'ents_r': total.recall,
+        'ents_f': total.fscore,
+        'ents_per_type': {label: {'p': score.precision, 'r': score.recall, 'f': score.fscore}
+                          for label, score in sorted(scores.items())},
+        'docs': n_docs,
+        'tokens': n_tokens,
+        'seconds': elapsed,
+        'docs_per_sec': n_docs / elapsed if elapsed > 0 else 0.0,
+        'tokens_per_sec': n_tokens / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def evaluate_model_file(model_path: Path, test_file: Path, batch_size: int = 64, n_process: int = 1) -> dict:
+    """
+    Load a trained model and evaluate it against a test file. `evaluate_models` runs it in a new process for each
+    model, so the memory measured is only the one used by this model.
+
+    :return: Dictionary with the results of `evaluate_model`, plus the load time of the model, the peak memory of
+    the process before loading the model (`base_memory`) and after evaluating it (`peak_memory`), and the difference
+    between both (`model_memory`), all in bytes. The memory fields are None if it can't be measured on this platform.
+    """
+    base_memory = get_peak_memory()
+    start = time.perf_counter()
+    nlp = spacy.load(model_path)
+    load_seconds = time.perf_counter() - start
+
+    docs = DocBin().from_disk(test_file).get_docs(nlp.vocab)
+    result = evaluate_model(nlp, docs, batch_size=batch_size, n_process=n_process)
+    result['load_seconds'] = load_seconds
+    result['base_memory'] = base_memory
+    result['peak_memory'] = get_peak_memory()
+    result['model_memory'] = result['peak_memory'] - base_memory if base_memory is not None else None
+    return result
+
+
+def evaluate_models(
+        models_path: Path,
+        test_data_path: Path,
+        model_names: list[str] = MODEL_NAMES,
+        model_variant: str = 'model-best',
+        batch_size: int = 64,
+        n_process: int = 1
+) -> dict[str, dict]:
+    """
+    Evaluate each trained model against its `<name>_test.spacy` file. Each model is evaluated in a new (spawned)
+    process, because the peak memory of a process only grows: evaluating the models one after the other in the same
+    process would report for each model the peak of all the models evaluated before it.
+
+    :return: Dictionary with the results of `evaluate_model_file` for each model.
+    """
+    results = {}
+    for model_name in model_names:
+        model_path = models_path / f"{model_name}_ner_model" / model_variant
+        test_file = test_data_path / f"{model_name}_test.spacy"
+
+        logger.info(f"Evaluating '{model_path}' with '{test_file}'.")
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            result = executor.submit(evaluate_model_file, model_path, test_file, batch_size, n_process).result()
+        results[model_name] = result
+
+        logger.info(f"{model_name}: P={result['ents_p']:.3f} R={result['ents_r']:.3f} F={result['ents_f']:.3f} "
+                    f"{result['docs_per_sec']:.1f} docs/sec {result['tokens_per_sec']:.1f} tokens/sec")
+        for label, score in result['ents_per_type'].items():
+            logger.info(f"    {label:<10} P={score['p']:.3f} R={score['r']:.3f} F={score['f']:.3f}")
+        if result['peak_memory'] is not None:
+            logger.info(f"    peak memory {result['peak_memory'] / 1024 / 1024:.1f} MB "
+                        f"({result['model_memory'] / 1024 / 1024:.1f} MB loading and evaluating the model)")
+
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Evaluate the trained models against the test data.")
+    parser.add_argument('--models', type=str, nargs='+', default=MODEL_NAMES,
+                        help=f"Models to evaluate. Default is {MODEL_NAMES}.")
+    parser.add_argument('--models_path', type=Path, default=Path(os.getcwd()) / "trained_models",
+                        help="Path to the trained models.")
+    parser.add_argument('--model_variant', type=str, default='model-best',
+                        help="Variant of the models to evaluate, e.g. 'model-best' or 'model-last'.")
+    parser.add_argument('--test_data_path', type=Path, default=Path(os.getcwd()) / "training_data",
+                        help="Path to the '*_test.spacy' files.")
+    parser.add_argument('--batch_size', type=int, default=64, help="Batch size used by nlp.pipe.")
+    parser.add_argument('--n_process', type=int, default=1, help="Number of processes used by nlp.pipe.")
+    parser.add_argument('--output', type=Path, default=None, help="JSON file where the results are saved.")
+
+    args = parser.parse_args()
+
+    if not all(model in MODEL_NAMES for model in args.models):
+        raise ValueError(f"Invalid model. Valid values are {MODEL_NAMES}.")
+
+    evaluation = evaluate_models(
+        models_path=args.models_path,
+        test_data_path=args.test_data_path,
+        model_names=args.models,
+        model_variant=args.model_variant,
+        batch_size=args.batch_size,
+        n_process=args.n_process
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(evaluation, f, indent=2)
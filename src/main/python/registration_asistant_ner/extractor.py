@@ -0,0 +1,182 @@
+import json
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+
+from spacy.language import Language
+from spacy.tokens import Span
+from spacy.tokens.doc import Doc
+
+from registration_asistant_ner.evaluate import MODEL_NAMES
+from registration_asistant_ner.training_data.data_preparer import correct_cover_page_text, upper_case
+from registration_asistant_ner.training_data.pdf_reader import get_text_from_page_range, get_page_count
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_with_confidences(nlp: Language, text: str, beam_width: int = 16) -> tuple[Doc, dict]:
+    """
+    Process the text and get the confidence of each entity, as the probability mass of the beam search parses of the
+    NER component that include it. The entities are the ones of the most probable parse, so the NER component runs
+    only once. Entities of pipelines without a statistical NER (e.g. rule based) are given full confidence.
+
+    The beam search must run on a doc without entities: the NER component keeps the entities already set on a doc,
+    so every parse of the beam would include them and they would always get full confidence.
+
+    :return: The processed doc and a dictionary with the confidence for each (start token, end token, label) in
+    `doc.ents`.
+    """
+    if 'ner' not in nlp.pipe_names:
+        doc = nlp(text)
+        return doc, {(ent.start, ent.end, ent.label_): 1.0 for ent in doc.ents}
+
+    ner = nlp.get_pipe('ner')
+    ner_index = nlp.pipe_names.index('ner')
+    doc = nlp.make_doc(text)
+    # Components before the NER (e.g. the tok2vec it listens to)
+    for _, component in nlp.pipeline[:ner_index]:
+        doc = component(doc)
+
+    scores = defaultdict(float)
+    best_probability, best_parse = -1.0, []
+    for beam in ner.beam_parse([doc], beam_width=beam_width, beam_density=0.0001):
+        for probability, parse in ner.moves.get_beam_parses(beam):
+            for start, end, label in parse:
+                scores[(start, end, label)] += probability
+            if probability > best_probability:
+                best_probability, best_parse = probability, parse
+    doc.set_ents([Span(doc, start, end, label) for start, end, label in best_parse])
+
+    for _, component in nlp.pipeline[ner_index + 1:]:
+        doc = component(doc)
+    # Entities added by the components after the NER (e.g. an entity ruler) are not scored by the beam
+    return doc, {(ent.start, ent.end, ent.label_): scores.get((ent.start, ent.end, ent.label_), 1.0)
+                 for ent in doc.ents}
+
+
+def extract_fields(models: dict[str, Language], text: str, fields: list[str]) -> dict[str, list[dict]]:
+    """
+    Run the model of each field over the text. Each model only recognizes its own field, so entities with other
+    labels (e.g. the PER or ORG labels inherited from the base model) are ignored.
+
+    :return: Dictionary with the entities found for each field, with their text and confidence.
+    """
+    entities = {}
+    for field in fields:
+        doc, confidences = parse_with_confidences(models[field], text)
+        entities[field] = [{'text': ent.text, 'confidence': confidences[(ent.start, ent.end, ent.label_)]}
+                           for ent in doc.ents if ent.label_ == field.upper()]
+    return entities
+
+
+def extract_from_pdf(
+        pdf_file: str,
+        models: dict[str, Language],
+        required_fields: list[str] = MODEL_NAMES,
+        threshold: float = 0.8,
+        max_pages: int = 3,
+        **kwargs
+) -> dict:
+    """
+    Extract the fields from a PDF, reading as few pages as possible. The cover page is OCR-ed first and, only while
+    some required field is missing or none of its entities reaches the `threshold` confidence, the following pages
+    are OCR-ed one at a time (up to `max_pages` pages). On each new page only the models of the missing fields run.
+
+    :param pdf_file: Path to the PDF file.
+    :param models: Dictionary with the model for each field (e.g. loaded with `compact.load_bundle`).
+    :param required_fields: Fields to extract.
+    :param threshold: Minimum confidence of an entity to consider its field found.
+    :param max_pages: Maximum number of pages to OCR.
+    :return: Dictionary with the entities found for each field (with the page they were found in), the number of
+    pages processed and the fields that are still missing.
+    """
+    fields = {field: [] for field in required_fields}
+    missing_fields = list(required_fields)
+    pages_processed = 0
+
+    for page in range(min(max_pages, get_page_count(pdf_file))):
+        text = upper_case(correct_cover_page_text(get_text_from_page_range(pdf_file, page, page, **kwargs)))
+        pages_processed += 1
+
+        for field, entities in extract_fields(models, text, missing_fields).items():
+            fields[field] += [dict(entity, page=page) for entity in entities]
+
+        missing_fields = [field for field in missing_fields
+                          if not any(entity['confidence'] >= threshold for entity in fields[field])]
+        if not missing_fields:
+            break
+
+    return {
+        'pdf_file': str(pdf_file),
+        'fields': fields,
+        'pages_processed': pages_processed,
+        'missing_fields': missing_fields,
+    }
+
+
+def extract_from_pdfs(pdf_files: list[str], models: dict[str, Language], **kwargs) -> list[dict]:
+    """
+    Extract the fields from each PDF with `extract_from_pdf`, logging how many pages were OCR-ed.
+    """
+    results = []
+    for pdf_file in pdf_files:
+        try:
+            result = extract_from_pdf(pdf_file, models, **kwargs)
+        except Exception as e:
+            logger.error(f"Error extracting fields from '{pdf_file}': {e}")
+            continue
+        logger.info(f"'{pdf_file}': {result['pages_processed']} pages processed, "
+                    f"missing fields: {result['missing_fields']}.")
+        results.append(result)
+
+    if results:
+        total_pages = sum(result['pages_processed'] for result in results)
+        logger.info(f"Processed {total_pages} pages for {len(results)} documents "
+                    f"({total_pages / len(results):.2f} pages per document).")
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    import spacy
+
+    from registration_asistant_ner.compact import load_bundle
+
+    parser = argparse.ArgumentParser(description="Extract the metadata fields from PDF files.")
+    parser.add_argument('pdf_files', type=str, nargs='+', help="PDF files to process.")
+    parser.add_argument('--fields', type=str, nargs='+', default=MODEL_NAMES,
+                        help=f"Fields to extract. Default is {MODEL_NAMES}.")
+    parser.add_argument('--models_path', type=Path, default=Path(os.getcwd()) / "trained_models",
+                        help="Path to the trained models.")
+    parser.add_argument('--bundle_path', type=Path, default=None,
+                        help="Path to a bundle created with compact.py. If given, the models are loaded from it.")
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help="Minimum confidence of an entity to stop reading pages for its field.")
+    parser.add_argument('--max_pages', type=int, default=3, help="Maximum number of pages to OCR per document.")
+    parser.add_argument('--output', type=Path, default=None, help="JSONL file where the results are saved.")
+
+    args = parser.parse_args()
+
+    if not all(field in MODEL_NAMES for field in args.fields):
+        raise ValueError(f"Invalid field. Valid values are {MODEL_NAMES}.")
+
+    if args.bundle_path:
+        loaded_models = load_bundle(args.bundle_path, args.fields)
+    else:
+        loaded_models = {field: spacy.load(args.models_path / f"{field}_ner_model" / "model-best")
+                         for field in args.fields}
+
+    extracted = extract_from_pdfs(args.pdf_files, loaded_models, required_fields=args.fields,
+                                  threshold=args.threshold, max_pages=args.max_pages)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for item in extracted:
+                f.write(json.dumps(item) + "\n")
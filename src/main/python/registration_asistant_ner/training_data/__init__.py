@@ -1,19 +1,18 @@
+from __future__ import annotations
+
 import os
 from pathlib import Path
 import random
+from typing import TYPE_CHECKING
 
-from pandas import DataFrame, Series
-from spacy.tokens import DocBin
-from spacy.tokens.doc import Doc
-
-from registration_asistant_ner.training_data.data_loader import load_scraped_data
-from registration_asistant_ner.training_data.data_preparer import prepare_data, generate_doc_with_entities, \
-    generate_training_data
 from datetime import datetime
-import pandas as pd
 
 import logging
 
+if TYPE_CHECKING:
+    from pandas import DataFrame, Series
+    from spacy.tokens.doc import Doc
+
 logging.basicConfig(
     format='%(asctime)s %(levelname)-8s %(message)s',
     level=logging.INFO,
@@ -30,11 +29,29 @@ def generate_training_data_files(
         from_columns: list[str],
         training_files_path: Path = Path(os.getcwd()),
         training_files_prefix: str = datetime.today().strftime('%Y%m%d'),
+        write_shard: bool = False,
+        name_index_file: Path | None = None,
+        drop_near_duplicate_covers: bool = True,
+        min_cover_similarity: float = 0.8,
         **kwargs
 ):
     """
     Get the training data from the XML files and PDF files.
+    If `write_shard` is True, all the documents are also saved to a shard (see `shards.write_shard`) together with
+    their handle, faculty, program and year, so the data can be filtered and split again without regenerating it.
+    If a `name_index_file` (see `name_index.py`) is given, the authors and advisors are matched by all their variants.
+    If `drop_near_duplicate_covers` is True, the records whose cover page has a Jaccard similarity of at least
+    `min_cover_similarity` with the one of a previous record with the same title or authors are dropped.
     """
+    # pandas, spaCy and the OCR dependencies are only imported when the training data is generated, so importing
+    # the package (or running the CLI with --help) stays fast
+    import pandas as pd
+    from spacy.tokens import DocBin
+
+    from registration_asistant_ner.training_data.data_loader import load_scraped_data
+    from registration_asistant_ner.training_data.data_preparer import prepare_data, generate_training_data
+    from registration_asistant_ner.training_data.deduplicator import drop_near_duplicates
+
     logger.info("Loading the scraped data.")
     if os.path.exists(training_files_path / "loaded_data.pkl"):
         raw_data: DataFrame = pd.read_pickle(training_files_path / "loaded_data.pkl")
@@ -43,13 +60,39 @@ def generate_training_data_files(
         raw_data: DataFrame = load_scraped_data(index_file, files_path, **kwargs)
         raw_data.to_pickle(training_files_path / "loaded_data.pkl")
 
+    name_index = None
+    if name_index_file is not None:
+        from registration_asistant_ner.training_data.name_index import NameIndex
+        name_index = NameIndex.from_disk(name_index_file)
+
     logger.info("Preparing the data.")
-    prepared_data: DataFrame = prepare_data(raw_data)
+    prepared_data: DataFrame = prepare_data(raw_data, name_index=name_index)
+
+    # Drop the records whose cover page is a near duplicate of another one (e.g. the same thesis published in two
+    # communities), so they don't end up in both the training and test data
+    if drop_near_duplicate_covers:
+        logger.info("Dropping near duplicate cover pages.")
+        prepared_data = drop_near_duplicates(prepared_data, 'cover_page_text', min_similarity=min_cover_similarity)
 
     logger.info("Generating the training data.")
     training_data: Series = generate_training_data(data=prepared_data, from_columns=from_columns)
     training_data_as_list: list[Doc] = training_data.to_list()
 
+    if write_shard:
+        from registration_asistant_ner.training_data.shards import write_shard as write_docs_to_shard
+
+        metadata = [
+            {
+                'handle': row.get('document_page', row.get('record_url')),
+                'faculty': row['faculty'],
+                'program': row['program'],
+                'year': row['year'],
+            }
+            for row in prepared_data.loc[training_data.index].to_dict(orient='records')
+        ]
+        logger.info("Saving the shard to disk.")
+        write_docs_to_shard(training_files_path / f"{training_files_prefix}.shard", training_data_as_list, metadata)
+
     # shuffle the data
     random.shuffle(training_data_as_list)
 
@@ -76,6 +119,20 @@ if __name__ == '__main__':
                         help="Path to save the training files.")
     parser.add_argument('--training_files_prefix', type=str, default=datetime.today().strftime('%Y%m%d'),
                         help="Prefix for the training files. Default is the current date in the format 'YYYYMMDD'.")
+    parser.add_argument('--write_shard', action='store_true',
+                        help="Also save all the documents with their metadata to '<prefix>.shard'.")
+    parser.add_argument('--name_index', type=Path, default=None,
+                        help="Name index built with name_index.py, to match the authors and advisors by all their "
+                             "variants.")
+    parser.add_argument('--keep_near_duplicates', action='store_true',
+                        help="Don't drop the records whose cover page is a near duplicate of the one of a previous "
+                             "record with the same title or authors.")
+    parser.add_argument('--min_cover_similarity', type=float, default=0.8,
+                        help="Minimum Jaccard similarity of the word 3-grams of two cover pages to consider them near "
+                             "duplicates. Default is 0.8.")
+    parser.add_argument('--ocr_store', type=Path, default=None,
+                        help="OCR store written by the OcrPipeline of the scraper, to reuse the text of the cover pages "
+                             "that were already OCR-ed while crawling.")
 
     args = parser.parse_args()
 
@@ -87,7 +144,12 @@ if __name__ == '__main__':
         files_path=Path(args.files_path),
         from_columns=args.entities,
         training_files_path=args.training_files_path,
-        training_files_prefix=args.training_files_prefix
+        training_files_prefix=args.training_files_prefix,
+        write_shard=args.write_shard,
+        name_index_file=args.name_index,
+        drop_near_duplicate_covers=not args.keep_near_duplicates,
+        min_cover_similarity=args.min_cover_similarity,
+        ocr_store=args.ocr_store
     )
 
     logger.info("Training data generation process completed.")
@@ -1,15 +1,20 @@
+from __future__ import annotations
+
+import json
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from pandas import DataFrame
-import pandas as pd
 import os
 import lxml.etree as ET
 import logging
-from tqdm import tqdm
-from pandarallel import pandarallel
 
+from registration_asistant_ner.training_data.deduplicator import drop_duplicated_files, get_file_checksum
+from registration_asistant_ner.training_data.parallel import initialize_pandarallel
 from registration_asistant_ner.training_data.pdf_reader import get_text_from_page
 
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
 logging.basicConfig(
     format='%(asctime)s %(levelname)-8s %(message)s',
     level=logging.INFO,
@@ -17,9 +22,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-tqdm.pandas()
-
-pandarallel.initialize(progress_bar=True)
 
 def parse_xml(xml_file: Path) -> dict :
     """
@@ -90,18 +92,44 @@ def get_file_path(base_folder, files, extension) -> Path | None:
     return None
 
 
-def load_scraped_data(index_file, files_path, **kwargs) -> DataFrame:
+def load_ocr_store(ocr_store) -> dict[str, str]:
+    """
+    Load the text of the cover pages OCR-ed while crawling (see `spiders.pipelines.OcrPipeline`).
+
+    :return: Dictionary with the text of the cover page for each PDF checksum.
+    """
+    if not os.path.exists(ocr_store):
+        return {}
+    with open(ocr_store, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return {record['checksum']: record['cover_page_text'] for record in records}
+
+
+def load_scraped_data(index_file, files_path, drop_duplicates: bool = True, ocr_store=None, **kwargs) -> DataFrame:
     """
     Load the scraped data from the `index_file` and the `files_path`.
+    If `drop_duplicates` is True, the records with the same PDF (by checksum) as a previous record are dropped
+    before parsing and OCR-ing them.
+    If an `ocr_store` is given, the text of the cover pages already OCR-ed while crawling is taken from it, and only
+    the remaining PDFs are OCR-ed.
     """
+    import pandas as pd
+    from tqdm import tqdm
+
     if not os.path.exists(index_file):
         raise FileNotFoundError(f"Index file '{index_file}' not found.")
 
     if not os.path.exists(files_path):
         raise FileNotFoundError(f"Files path '{files_path}' not found.")
 
+    tqdm.pandas()
+    initialize_pandarallel()
+
     index_df = pd.read_json(index_file, lines=True)
 
+    if drop_duplicates:
+        index_df = drop_duplicated_files(index_df)
+
     # Get the full path of the XML and PDF files
     index_df['xml_file'] = index_df['files'].progress_apply(lambda x: get_file_path(files_path, x, '.xml'))
     index_df['pdf_file'] = index_df['files'].progress_apply(lambda x: get_file_path(files_path, x, '.pdf'))
@@ -109,8 +137,14 @@ def load_scraped_data(index_file, files_path, **kwargs) -> DataFrame:
     # Parse the XML file to extract the metadata and add it to the DataFrame
     index_df = index_df.join(index_df['xml_file'].progress_apply(parse_xml).apply(pd.Series))
 
-    # Read the text from the cover page of the PDF file
-    index_df['cover_page_text'] = index_df['pdf_file'].parallel_apply(read_cover_page_text)
+    # Read the text from the cover page of the PDF file, unless it is already in the OCR store
+    ocr_texts = load_ocr_store(ocr_store) if ocr_store else {}
+    index_df['cover_page_text'] = index_df['files'].apply(lambda x: ocr_texts.get(get_file_checksum(x, '.pdf')))
+    missing = index_df['cover_page_text'].isna()
+    logger.info(f"Found {len(index_df) - missing.sum()} cover pages in the OCR store, OCR-ing {missing.sum()}.")
+    if missing.any():
+        index_df.loc[missing, 'cover_page_text'] = (index_df.loc[missing, 'pdf_file']
+                                                    .parallel_apply(read_cover_page_text))
 
     logger.info(f"Loaded {len(index_df)} records from '{index_file}'.")
 
@@ -1,16 +1,24 @@
+from __future__ import annotations
+
 import re
+from functools import cache
+from typing import TYPE_CHECKING
 
-from pandas import DataFrame, Series
-from pandarallel import pandarallel
 import unidecode
-from spacy.tokens.doc import Doc
 import logging
 
+from registration_asistant_ner.training_data.parallel import initialize_pandarallel
+
+if TYPE_CHECKING:
+    from pandas import DataFrame, Series
+    from spacy.language import Language
+    from spacy.tokens.doc import Doc
+
+    from registration_asistant_ner.training_data.name_index import NameIndex
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-pandarallel.initialize(progress_bar=True)
-
 
 def correct_program(value: str) -> str:
     # Add 'DE' to the program name if it is missing.
@@ -66,6 +74,14 @@ def upper_case(value: str) -> str:
     return value.upper()
 
 
+@cache
+def normalize_name(name: str) -> str:
+    """
+    Correct and upper case a name. The result is cached, as the same advisors appear in many records.
+    """
+    return upper_case(correct_data(name))
+
+
 def permute_names(names: list[str]) -> list[str]:
     """
     Generate permutations of the names. For example, ['Doe, John'] -> ['John Doe', 'Doe John']
@@ -93,9 +109,11 @@ def permute_names(names: list[str]) -> list[str]:
     return permuted_names
 
 
-def prepare_data(data: DataFrame) -> DataFrame:
+def prepare_data(data: DataFrame, name_index: NameIndex | None = None) -> DataFrame:
     """
     Prepare the data.
+    If a `name_index` is given, the authors and advisors are replaced by all their variants in the index (see
+    `name_index.generate_name_variants`) instead of only the two orderings given by `permute_names`.
     """
     # Remove rows with missing cover page text
     data = data.dropna(subset=['cover_page_text'])
@@ -104,8 +122,8 @@ def prepare_data(data: DataFrame) -> DataFrame:
     data['title'] = data['title'].apply(correct_data).apply(upper_case)
     data['abstract'] = data['abstract'].apply(correct_data).apply(upper_case)
     data['subjects'] = data['subjects'].apply(lambda x: [upper_case(correct_data(value)) for value in x])
-    data['authors'] = data['authors'].apply(lambda x: [upper_case(correct_data(value)) for value in x])
-    data['advisors'] = data['advisors'].apply(lambda x: [upper_case(correct_data(value)) for value in x])
+    data['authors'] = data['authors'].apply(lambda x: [normalize_name(value) for value in x])
+    data['advisors'] = data['advisors'].apply(lambda x: [normalize_name(value) for value in x])
     data['issued'] = data['issued'].apply(correct_data).apply(upper_case)
     data['cover_page_text'] = data['cover_page_text'].apply(correct_cover_page_text).apply(upper_case)
 
@@ -142,14 +160,21 @@ def prepare_data(data: DataFrame) -> DataFrame:
                        .apply(correct_program))
 
     # Generate permutations of the names
-    data['authors'] = data['authors'].apply(permute_names)
-    data['advisors'] = data['advisors'].apply(permute_names)
+    generate_variants = name_index.get_variants if name_index is not None else permute_names
+    data['authors'] = data['authors'].apply(generate_variants)
+    data['advisors'] = data['advisors'].apply(generate_variants)
 
     return data
 
-import spacy
-# nlp = spacy.blank("es")
-nlp = spacy.load("es_core_news_lg")
+
+@cache
+def get_nlp() -> Language:
+    """
+    Get the spaCy model used to tokenize the cover pages. It is loaded on first use, as loading it takes seconds.
+    """
+    import spacy
+    # return spacy.blank("es")
+    return spacy.load("es_core_news_lg")
 
 
 def build_matcher_pattern(text: str) -> str:
@@ -178,7 +203,9 @@ def generate_doc_with_entities(row: dict, main_text_column: str, columns_to_matc
     :param columns_to_match: List of columns to match.
     :return: Doc object with the entities
     """
-    doc = nlp(row[main_text_column])
+    from spacy.util import filter_spans
+
+    doc = get_nlp()(row[main_text_column])
     spans = []
     for column in columns_to_match:
         assert column in row, f"Column '{column}' not found in the row."
@@ -201,7 +228,9 @@ def generate_doc_with_entities(row: dict, main_text_column: str, columns_to_matc
                 if span is not None:
                     spans.append(span)
     try:
-        doc.set_ents(spans)
+        # The variants of a name overlap (e.g. 'JUAN CARLOS MAMANI QUISPE' and 'JUAN CARLOS MAMANI'), only the
+        # longest match is kept as an entity
+        doc.set_ents(filter_spans(spans))
         return doc
     except Exception as e:
         logger.warning(f"Error setting entities for the document: {e}")
@@ -219,6 +248,9 @@ def generate_training_data(data: DataFrame, from_columns: list[str]) -> Series:
     :param from_columns: List of columns to match. The entities will be extracted from these columns.
     :return: pandas Series with the Doc objects.
     """
+    initialize_pandarallel()
+    # load the model before starting the workers, so they share it instead of loading it once each
+    get_nlp()
     training_df: Series = data.parallel_apply(
         lambda row: generate_doc_with_entities(row, 'cover_page_text', from_columns),
         axis=1,
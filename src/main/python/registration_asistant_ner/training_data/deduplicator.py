@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+
+
+def get_file_checksum(files, extension) -> str | None:
+    """
+    Get the checksum of the file from the list of files. Only returns the checksum of the first file found.
+    The checksum is computed by the FilesPipeline from the content of the file (unlike the path, which comes
+    from the URL).
+    """
+    for file in files:
+        if "url" in file and "checksum" in file and extension in file["url"]:
+            return file["checksum"]
+    return None
+
+
+def drop_duplicated_files(data: DataFrame, extension: str = '.pdf') -> DataFrame:
+    """
+    Drop the rows whose file (by default, the PDF) has the same content as the one of a previous row.
+    Rows without a checksum are kept.
+    """
+    checksums = data['files'].apply(lambda x: get_file_checksum(x, extension))
+    duplicated = checksums.duplicated() & checksums.notna()
+    logger.info(f"Dropped {duplicated.sum()} of {len(data)} rows with a duplicated '{extension}' file.")
+    return data[~duplicated]
+
+
+def simhash(text: str, ngram_size: int = 1) -> int:
+    """
+    Compute the SimHash of the text, using the word n-grams as features. Texts that share most of their n-grams
+    (e.g. the same cover page OCR-ed twice, with small OCR differences) have hashes with a small Hamming distance.
+    Single words are used by default: cover pages are short, and with longer n-grams a single OCR error changes
+    too many of the features.
+    """
+    words = text.split()
+    ngrams = [" ".join(words[i:i + ngram_size]) for i in range(max(len(words) - ngram_size + 1, 1))]
+
+    weights = [0] * SIMHASH_BITS
+    for ngram in ngrams:
+        digest = int.from_bytes(hashlib.md5(ngram.encode("utf-8")).digest()[:SIMHASH_BITS // 8], "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+def get_shingles(text: str, size: int = 3) -> set[str]:
+    """
+    Get the set of word n-grams (shingles) of the text.
+    """
+    words = text.split()
+    return {" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+
+
+def jaccard_similarity(shingles_1: set[str], shingles_2: set[str]) -> float:
+    if not shingles_1 and not shingles_2:
+        return 1.0
+    return len(shingles_1 & shingles_2) / len(shingles_1 | shingles_2)
+
+
+def find_near_duplicates(
+        texts: list[str],
+        metadata: list[set] | None = None,
+        max_distance: int = 3,
+        min_similarity: float = 0.8
+) -> list[bool]:
+    """
+    Find the texts that are near duplicates of a previous text.
+
+    The SimHashes only select the candidates: the cover pages of a program share most of their words, so different
+    theses can have hashes within `max_distance` bits. A candidate is a near duplicate only if the Jaccard similarity
+    of the word 3-grams of both texts is at least `min_similarity` and, if `metadata` is given, both records share
+    any metadata value (e.g. the same title or the same authors).
+
+    The hashes are split into `max_distance + 1` bands: two hashes within `max_distance` bits of each other
+    are equal in at least one band, so only the texts sharing a band are compared.
+
+    :param texts: Texts to compare.
+    :param metadata: Set of metadata values of each record, in the same order as `texts`.
+    :param max_distance: Maximum Hamming distance between the SimHashes of two candidates.
+    :param min_similarity: Minimum Jaccard similarity of the 3-grams of two near duplicates.
+    :return: List with True for each text that is a near duplicate of a previous one.
+    """
+    bands = max_distance + 1
+    band_size = SIMHASH_BITS // bands
+    buckets: list[dict[int, list[int]]] = [{} for _ in range(bands)]
+
+    kept = []
+    duplicated = []
+    for i, text in enumerate(texts):
+        text_hash = simhash(text)
+        shingles = get_shingles(text)
+        values = metadata[i] if metadata is not None else None
+        band_keys = [(text_hash >> (band * band_size)) & ((1 << band_size) - 1) for band in range(bands)]
+
+        candidates = {candidate for band, key in enumerate(band_keys) for candidate in buckets[band].get(key, [])}
+        is_duplicated = any(
+            bin(text_hash ^ kept[candidate][0]).count("1") <= max_distance
+            and (values is None or bool(values & kept[candidate][2]))
+            and jaccard_similarity(shingles, kept[candidate][1]) >= min_similarity
+            for candidate in candidates
+        )
+        duplicated.append(is_duplicated)
+
+        if not is_duplicated:
+            for band, key in enumerate(band_keys):
+                buckets[band].setdefault(key, []).append(len(kept))
+            kept.append((text_hash, shingles, values))
+
+    return duplicated
+
+
+def get_record_metadata(row: dict) -> set:
+    """
+    Get the values that identify the thesis of a record: its title and its set of authors.
+    """
+    values = set()
+    if row.get('title'):
+        values.add(('title', " ".join(str(row['title']).split())))
+    if row.get('authors'):
+        values.add(('authors', tuple(sorted(row['authors']))))
+    return values
+
+
+def drop_near_duplicates(
+        data: DataFrame,
+        column: str = 'cover_page_text',
+        max_distance: int = 3,
+        min_similarity: float = 0.8
+) -> DataFrame:
+    """
+    Drop the rows whose text in `column` is a near duplicate of the text of a previous row with the same title or
+    the same authors (see `find_near_duplicates`).
+    """
+    metadata = [get_record_metadata(row) for row in data.to_dict(orient='records')]
+    duplicated = find_near_duplicates(data[column].to_list(), metadata, max_distance, min_similarity)
+    logger.info(f"Dropped {sum(duplicated)} of {len(data)} rows with a near duplicate '{column}'.")
+    return data[[not value for value in duplicated]]
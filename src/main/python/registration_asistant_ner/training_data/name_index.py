@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+from registration_asistant_ner.training_data.data_preparer import normalize_name
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+# Academic titles that precede the names of advisors on the cover pages (e.g. 'TUTOR: LIC. JUAN MAMANI')
+TITLES = ['LIC', 'ING', 'DR', 'DRA', 'MSC', 'M SC', 'MG', 'PHD', 'PH D', 'ARQ', 'ABOG', 'ECON', 'AUD']
+TITLES_PATTERN = re.compile(r'^(?:(?:' + '|'.join(TITLES) + r')\s+)+')
+
+
+def name_key(name: str) -> str:
+    """
+    Get the lookup key of a name: normalized, without punctuation and without leading academic titles.
+    'Lic. Mamani Quispe, Juan C.' -> 'MAMANI QUISPE JUAN C'
+    """
+    key = " ".join(re.sub(r'[.,;:]', ' ', normalize_name(name)).split())
+    return TITLES_PATTERN.sub('', key)
+
+
+def generate_name_variants(name: str) -> list[str]:
+    """
+    Generate the ways a name in the 'Surnames, Given names' form could be written on a cover page:
+    both orderings (like `permute_names`), with only the first surname, with only the first given name and with
+    the given names as initials. For example, 'MAMANI QUISPE, JUAN CARLOS' -> ['JUAN CARLOS MAMANI QUISPE',
+    'MAMANI QUISPE JUAN CARLOS', 'JUAN MAMANI QUISPE', 'MAMANI QUISPE JUAN', 'J. C. MAMANI QUISPE', ...]
+    """
+    parts = [part.strip() for part in normalize_name(name).split(",")[:2]]
+    if len(parts) < 2 or not parts[0] or not parts[1]:
+        return [" ".join(parts).strip()]
+
+    surnames, given_names = parts[0].split(), parts[1].split()
+    surname_options = [" ".join(surnames)] + ([surnames[0]] if len(surnames) > 1 else [])
+    given_name_options = [" ".join(given_names)] + ([given_names[0]] if len(given_names) > 1 else [])
+    given_name_options += [" ".join(f"{given_name[0]}." for given_name in given_names)]
+    if len(given_names) > 1:
+        given_name_options.append(f"{given_names[0][0]}.")
+
+    variants = []
+    for surname in surname_options:
+        for given_name in given_name_options:
+            for variant in (f"{given_name} {surname}", f"{surname} {given_name}"):
+                if variant not in variants:
+                    variants.append(variant)
+    return variants
+
+
+class NameIndex:
+    """
+    Index of the names of authors and advisors harvested from the METS files. Holds the canonical form of each name
+    ('SURNAMES, GIVEN NAMES', normalized as in `prepare_data`), its variants and the number of records it appears in,
+    and maps the key of every variant to the canonical names, so names can be looked up in O(1).
+    """
+
+    def __init__(self, names: dict[str, dict] | None = None):
+        self.names: dict[str, dict] = {}
+        self._keys: dict[str, list[str]] = {}
+        for canonical, entry in (names or {}).items():
+            self._add(canonical, entry['frequency'], entry['variants'])
+
+    def _add(self, canonical: str, frequency: int, variants: list[str]) -> None:
+        self.names[canonical] = {'frequency': frequency, 'variants': variants}
+        for key in {name_key(canonical)} | {name_key(variant) for variant in variants}:
+            self._keys.setdefault(key, []).append(canonical)
+
+    def add_names(self, names: Iterable[str]) -> None:
+        """
+        Add the names to the index, counting one occurrence for each time a name is given.
+        """
+        for canonical, count in Counter(normalize_name(name) for name in names if name.strip()).items():
+            if canonical in self.names:
+                self.names[canonical]['frequency'] += count
+            else:
+                self._add(canonical, count, generate_name_variants(canonical))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def lookup(self, name: str) -> list[str]:
+        """
+        Get the canonical names that have `name` as a variant, most frequent first.
+        """
+        return sorted(self._keys.get(name_key(name), []), key=lambda canonical: -self.names[canonical]['frequency'])
+
+    def link(self, name: str) -> str | None:
+        """
+        Link a name (e.g. extracted by the NER models) to the most frequent canonical name it is a variant of.
+        """
+        canonicals = self.lookup(name)
+        return canonicals[0] if canonicals else None
+
+    def get_variants(self, names: list[str]) -> list[str]:
+        """
+        Get the variants of each name, to match them in the cover pages. Names that are not in the index get their
+        variants generated on the fly.
+        """
+        variants = []
+        for name in names:
+            canonical = normalize_name(name)
+            entry = self.names.get(canonical)
+            variants += entry['variants'] if entry else generate_name_variants(canonical)
+        return variants
+
+    def to_disk(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'names': self.names}, f, ensure_ascii=False)
+
+    @classmethod
+    def from_disk(cls, path: Path) -> "NameIndex":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)['names'])
+
+
+def build_name_index(index_file: Path, files_path: Path) -> NameIndex:
+    """
+    Build the name index from the authors and advisors of the METS files of a scrape.
+    """
+    from registration_asistant_ner.training_data.data_loader import get_file_path, parse_xml
+
+    name_index = NameIndex()
+    with open(index_file, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            xml_file = get_file_path(files_path, json.loads(line).get('files', []), '.xml')
+            if xml_file is None:
+                continue
+            metadata = parse_xml(xml_file)
+            name_index.add_names(metadata['authors'] + metadata['advisors'])
+
+    logger.info(f"Built name index with {len(name_index)} names from '{index_file}'.")
+    return name_index
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the index of names of authors and advisors.")
+    parser.add_argument('index_file', type=Path, help="Path to the index file generated by the scraper.")
+    parser.add_argument('files_path', type=Path, help="Path to the files directory generated by the scraper.")
+    parser.add_argument('--output', type=Path, default=Path(os.getcwd()) / "name_index.json",
+                        help="Path to save the name index.")
+
+    args = parser.parse_args()
+
+    build_name_index(args.index_file, args.files_path).to_disk(args.output)
@@ -0,0 +1,11 @@
+from functools import cache
+
+
+@cache
+def initialize_pandarallel() -> None:
+    """
+    Initialize pandarallel, only once per process. It is done on first use instead of at import time, as it imports
+    pandas and sets up the worker processes.
+    """
+    from pandarallel import pandarallel
+    pandarallel.initialize(progress_bar=True)
@@ -1,10 +1,10 @@
+from __future__ import annotations
+
 import os
+from typing import TYPE_CHECKING
 
-import pymupdf
-from pymupdf import Pixmap, Page
-import cv2
-import numpy as np
-from pytesseract import pytesseract
+if TYPE_CHECKING:
+    from pymupdf import Pixmap
 
 DPI = 300
 AREA_THRESHOLD = DPI * DPI * 0.03
@@ -16,17 +16,32 @@ def get_text_from_page(pdf, page_number, **kwargs):
     return get_text_from_image(img_page, **kwargs)
 
 
-def get_text_from_page_range(pdf, start_page, end_page):
-    return "\n".join(get_text_from_page(pdf, page) for page in range(start_page, end_page + 1))
+def get_text_from_page_range(pdf, start_page, end_page, **kwargs):
+    return "\n".join(get_text_from_page(pdf, page, **kwargs) for page in range(start_page, end_page + 1))
+
+
+def get_page_count(pdf) -> int:
+    import pymupdf
+
+    with pymupdf.open(pdf) as doc:
+        return doc.page_count
 
 
 def get_page_as_image(pdf, page_number) -> Pixmap:
+    import pymupdf
+
     doc = pymupdf.open(pdf)
     page = doc.load_page(page_number)
     return page.get_pixmap(dpi=DPI)
 
 
 def get_text_from_image(image: Pixmap, **kwargs) -> str:
+    import pymupdf
+    from pymupdf import Page
+    import cv2
+    import numpy as np
+    from pytesseract import pytesseract
+
     if False:
         tessdata = kwargs.get("tessdata", None)
         imgpdf = pymupdf.open("pdf", image.pdfocr_tobytes(language="spa", tessdata=tessdata))
@@ -42,6 +57,11 @@ def get_text_from_image(image: Pixmap, **kwargs) -> str:
 
 
 def remove_logos_from_page(imagePage: Pixmap):
+    import pymupdf
+    from pymupdf import Pixmap
+    import cv2
+    import numpy as np
+
     img = cv2.imdecode(
         np.frombuffer(bytearray(imagePage.tobytes()), dtype=np.uint8), cv2.IMREAD_COLOR
     )
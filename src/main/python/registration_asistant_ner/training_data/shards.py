@@ -0,0 +1,273 @@
+import json
+import logging
+import mmap
+import os
+import random
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import spacy
+from spacy.language import Language
+from spacy.tokens import DocBin
+from spacy.tokens.doc import Doc
+from spacy.training import Example
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx"
+
+
+def get_index_path(path: Path) -> Path:
+    return Path(str(path) + INDEX_SUFFIX)
+
+
+def write_shard(path: Path, docs: Iterable[Doc], metadata: Iterable[dict] | None = None) -> int:
+    """
+    Write the docs to a shard: a data file with one zlib compressed record per doc holding its text and its
+    entities as character offsets, and an index file (`<path>.idx`, JSONL) with one line per doc holding the offset
+    and length of its record in the data file, its entity labels and the given metadata (e.g. handle, faculty and
+    year). The tokens are not stored, the docs are tokenized again when they are read.
+
+    :param path: Path to the data file.
+    :param docs: Docs with the entities.
+    :param metadata: Dictionary with the metadata of each doc, in the same order as `docs`.
+    :return: Number of docs written.
+    """
+    docs = list(docs)
+    metadata = list(metadata) if metadata is not None else [{} for _ in docs]
+    if len(docs) != len(metadata):
+        raise ValueError(f"Got {len(docs)} docs but metadata for {len(metadata)}.")
+
+    offset = 0
+    with open(path, "wb") as data_file, open(get_index_path(path), "w", encoding="utf-8") as index_file:
+        for doc, doc_metadata in zip(docs, metadata):
+            data = zlib.compress(json.dumps({
+                'text': doc.text,
+                'ents': [[ent.start_char, ent.end_char, ent.label_] for ent in doc.ents],
+            }).encode("utf-8"))
+            data_file.write(data)
+            index_file.write(json.dumps({
+                **doc_metadata,
+                'offset': offset,
+                'length': len(data),
+                'labels': sorted({ent.label_ for ent in doc.ents}),
+                'n_ents': len(doc.ents),
+            }) + "\n")
+            offset += len(data)
+    return len(docs)
+
+
+class ShardReader:
+    """
+    Random access reader of a shard written with `write_shard`. The index is loaded in memory, the docs are read
+    from the memory mapped data file only when requested.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(get_index_path(self.path), encoding="utf-8") as index_file:
+            self.index: list[dict] = [json.loads(line) for line in index_file if line.strip()]
+        self._file = open(self.path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.path.getsize(self.path) > 0 else b""
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def get_doc(self, i: int, nlp: Language) -> Doc:
+        """
+        Read the i-th doc, tokenized with the tokenizer of `nlp` and with its entities set.
+        """
+        entry = self.index[i]
+        record = json.loads(zlib.decompress(self._data[entry['offset']:entry['offset'] + entry['length']]))
+        doc = nlp.make_doc(record['text'])
+        spans = [doc.char_span(start, end, label, alignment_mode='expand') for start, end, label in record['ents']]
+        doc.set_ents([span for span in spans if span is not None])
+        return doc
+
+    def get_docs(self, nlp: Language, indices: Iterable[int] | None = None) -> Iterator[Doc]:
+        for i in (range(len(self)) if indices is None else indices):
+            yield self.get_doc(i, nlp)
+
+    def filter(
+            self,
+            labels: list[str] | None = None,
+            faculty: str | None = None,
+            min_year: int | None = None,
+            max_year: int | None = None
+    ) -> list[int]:
+        """
+        Get the indices of the docs that have any of the `labels`, are from the `faculty` and were issued
+        between `min_year` and `max_year` (both included). Filters set to None are not applied.
+        """
+        indices = []
+        for i, entry in enumerate(self.index):
+            if labels is not None and not set(labels) & set(entry['labels']):
+                continue
+            if faculty is not None and entry.get('faculty') != faculty:
+                continue
+            year = int(entry['year']) if entry.get('year') else None
+            if min_year is not None and (year is None or year < min_year):
+                continue
+            if max_year is not None and (year is None or year > max_year):
+                continue
+            indices.append(i)
+        return indices
+
+    def sample(self, size: int, indices: list[int] | None = None, seed: int = 0) -> list[int]:
+        """
+        Get a random sample of `size` indices (from `indices`, or from all the docs).
+        """
+        indices = list(range(len(self))) if indices is None else indices
+        return sorted(random.Random(seed).sample(indices, min(size, len(indices))))
+
+    def split(
+            self,
+            dev_ratio: float = 0.2,
+            stratify_by: str | None = 'faculty',
+            indices: list[int] | None = None,
+            seed: int = 0
+    ) -> tuple[list[int], list[int]]:
+        """
+        Split the docs (from `indices`, or all of them) into train and dev indices. If `stratify_by` is given, each
+        value of that index field (e.g. 'faculty' or 'year') keeps the same proportion in both splits.
+        """
+        indices = list(range(len(self))) if indices is None else indices
+        groups = defaultdict(list)
+        for i in indices:
+            groups[str(self.index[i].get(stratify_by)) if stratify_by else None].append(i)
+
+        rng = random.Random(seed)
+        train, dev = [], []
+        for key in sorted(groups, key=str):
+            group = groups[key]
+            rng.shuffle(group)
+            dev_size = round(len(group) * dev_ratio)
+            dev += group[:dev_size]
+            train += group[dev_size:]
+        return sorted(train), sorted(dev)
+
+
+def convert_docbin(docbin_file: Path, path: Path) -> int:
+    """
+    Convert a DocBin file (e.g. `title_training.spacy`) into a shard. DocBins don't keep the metadata of the
+    documents, so only the entity labels are indexed.
+    """
+    docs = DocBin().from_disk(docbin_file).get_docs(spacy.blank("es").vocab)
+    return write_shard(path, docs)
+
+
+@spacy.registry.readers("registration_asistant_ner.ShardCorpus.v1")
+def create_shard_corpus(
+        path: Path,
+        split: str | None = None,
+        dev_ratio: float = 0.2,
+        stratify_by: str | None = 'faculty',
+        labels: list[str] | None = None,
+        seed: int = 0,
+        limit: int = 0
+) -> Callable[[Language], Iterator[Example]]:
+    """
+    spaCy corpus reader over a shard, so a training config can read the train and dev data from the same shard:
+
+        [corpora.train]
+        @readers = "registration_asistant_ner.ShardCorpus.v1"
+        path = "training_data/title.shard"
+        split = "train"
+
+    The docs are read one at a time from the memory mapped shard, so the shard is never loaded whole.
+
+    :param split: 'train' or 'dev' to read one side of `ShardReader.split`, None to read all the docs.
+    :param labels: Only read the docs that have any of these labels.
+    :param limit: Maximum number of docs to read, 0 reads all of them.
+    """
+    if split not in (None, 'train', 'dev'):
+        raise ValueError(f"Invalid split '{split}'. Valid values are None, 'train' and 'dev'.")
+
+    def read(nlp: Language) -> Iterator[Example]:
+        with ShardReader(path) as reader:
+            indices = reader.filter(labels=labels) if labels else None
+            if split is not None:
+                train, dev = reader.split(dev_ratio=dev_ratio, stratify_by=stratify_by, indices=indices, seed=seed)
+                indices = train if split == 'train' else dev
+            if limit:
+                indices = (indices if indices is not None else list(range(len(reader))))[:limit]
+            for doc in reader.get_docs(nlp, indices):
+                yield Example(nlp.make_doc(doc.text), doc)
+
+    return read
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert, inspect and split training data shards.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help="Convert a DocBin (.spacy) file into a shard.")
+    convert_parser.add_argument('docbin_file', type=Path, help="DocBin file to convert.")
+    convert_parser.add_argument('shard', type=Path, help="Path to the shard to write.")
+
+    info_parser = subparsers.add_parser('info', help="Show the number of docs by label, faculty and year.")
+    info_parser.add_argument('shard', type=Path, help="Path to the shard.")
+
+    split_parser = subparsers.add_parser('split', help="Write the train and dev DocBin files from a shard.")
+    split_parser.add_argument('shard', type=Path, help="Path to the shard.")
+    split_parser.add_argument('output_prefix', type=str,
+                              help="Prefix of the output files, '<prefix>_training.spacy' and '<prefix>_test.spacy'.")
+    split_parser.add_argument('--dev_ratio', type=float, default=0.2, help="Ratio of docs in the dev split.")
+    split_parser.add_argument('--stratify_by', type=str, default='faculty', help="Index field to stratify by.")
+    split_parser.add_argument('--labels', type=str, nargs='+', default=None, help="Only keep docs with these labels.")
+    split_parser.add_argument('--faculty', type=str, default=None, help="Only keep docs from this faculty.")
+    split_parser.add_argument('--min_year', type=int, default=None, help="Only keep docs issued from this year.")
+    split_parser.add_argument('--max_year', type=int, default=None, help="Only keep docs issued until this year.")
+    split_parser.add_argument('--size', type=int, default=None, help="Randomly sample this number of docs.")
+    split_parser.add_argument('--seed', type=int, default=0, help="Seed for sampling and splitting.")
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        logger.info(f"Wrote {convert_docbin(args.docbin_file, args.shard)} docs to '{args.shard}'.")
+    elif args.command == 'info':
+        with ShardReader(args.shard) as shard_reader:
+            logger.info(f"{len(shard_reader)} docs in '{args.shard}'.")
+            for field in ['labels', 'faculty', 'year']:
+                counts = defaultdict(int)
+                for index_entry in shard_reader.index:
+                    values = index_entry.get(field)
+                    for value in (values if isinstance(values, list) else [values]):
+                        counts[value] += 1
+                for value, count in sorted(counts.items(), key=lambda item: -item[1]):
+                    logger.info(f"    {field} {value}: {count}")
+    elif args.command == 'split':
+        with ShardReader(args.shard) as shard_reader:
+            selected = shard_reader.filter(labels=args.labels, faculty=args.faculty, min_year=args.min_year,
+                                           max_year=args.max_year)
+            if args.size is not None:
+                selected = shard_reader.sample(args.size, selected, seed=args.seed)
+            train_indices, dev_indices = shard_reader.split(args.dev_ratio, args.stratify_by, selected, args.seed)
+
+            blank_nlp = spacy.blank("es")
+            train_docbin = DocBin(docs=shard_reader.get_docs(blank_nlp, train_indices))
+            train_docbin.to_disk(f"{args.output_prefix}_training.spacy")
+            dev_docbin = DocBin(docs=shard_reader.get_docs(blank_nlp, dev_indices))
+            dev_docbin.to_disk(f"{args.output_prefix}_test.spacy")
+            logger.info(f"Wrote {len(train_indices)} training docs and {len(dev_indices)} test docs.")
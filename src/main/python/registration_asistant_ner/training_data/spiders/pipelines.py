@@ -0,0 +1,104 @@
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from registration_asistant_ner.training_data.data_loader import get_file_path, load_ocr_store, read_cover_page_text
+from registration_asistant_ner.training_data.deduplicator import get_file_checksum
+
+logger = logging.getLogger(__name__)
+
+
+class OcrPipeline:
+    """
+    Item pipeline that submits the PDF of each item to a pool of OCR worker processes as soon as the FilesPipeline
+    has downloaded it, so the OCR runs while the crawl goes on instead of after it. The text of the cover pages is
+    appended to the OCR store (a JSONL file keyed by the checksum of the PDF), which `load_scraped_data` reads
+    instead of OCR-ing the PDFs again. PDFs already in the store, or already submitted, are not OCR-ed again.
+
+    It must run after the FilesPipeline:
+
+        ITEM_PIPELINES = {
+            "scrapy.pipelines.files.FilesPipeline": 1,
+            "registration_asistant_ner.training_data.spiders.pipelines.OcrPipeline": 300,
+        }
+        OCR_STORE = "ocr_store.jsonl"
+        OCR_WORKERS = 4  # defaults to the number of CPUs
+    """
+
+    def __init__(self, files_store: str, ocr_store: str, workers: int | None = None,
+                 ocr_function: Callable[[str], str | None] | None = None):
+        self.files_store = files_store
+        self.ocr_store = Path(ocr_store)
+        self.workers = workers
+        self.ocr_function = ocr_function or read_cover_page_text
+        self.executor: ProcessPoolExecutor | None = None
+        self.store_file = None
+        self.lock = threading.Lock()
+        self.seen_checksums: set[str] = set()
+        self.stats = {'submitted': 0, 'skipped': 0, 'done': 0, 'failed': 0}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from scrapy.utils.misc import load_object
+
+        settings = crawler.settings
+        return cls(
+            files_store=settings.get('FILES_STORE'),
+            ocr_store=settings.get('OCR_STORE', 'ocr_store.jsonl'),
+            workers=settings.getint('OCR_WORKERS') or None,
+            ocr_function=load_object(settings.get(
+                'OCR_FUNCTION', 'registration_asistant_ner.training_data.data_loader.read_cover_page_text'))
+        )
+
+    def open_spider(self, spider):
+        self.seen_checksums = set(load_ocr_store(self.ocr_store))
+        self.store_file = open(self.ocr_store, "a", encoding="utf-8")
+        # The workers are started from the running reactor, which has threads: forking it could deadlock on a lock
+        # held by another thread, so they are spawned instead
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def process_item(self, item, spider):
+        files = item.get('files', [])
+        pdf_file = get_file_path(self.files_store, files, '.pdf')
+        checksum = get_file_checksum(files, '.pdf')
+        if pdf_file is None or checksum is None:
+            return item
+
+        if checksum in self.seen_checksums:
+            self.stats['skipped'] += 1
+            return item
+        self.seen_checksums.add(checksum)
+
+        future = self.executor.submit(self.ocr_function, str(pdf_file))
+        future.add_done_callback(lambda f: self._store(f, checksum, pdf_file, files))
+        self.stats['submitted'] += 1
+        return item
+
+    def _store(self, future: Future, checksum: str, pdf_file: Path, files: list[dict]) -> None:
+        # Called from the thread of the executor that collects the results, hence the lock
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Error OCR-ing '{pdf_file}' (checksum {checksum}): {error!r}")
+        text = future.result() if error is None else None
+        with self.lock:
+            if text is None:
+                self.stats['failed'] += 1
+                return
+            self.store_file.write(json.dumps({
+                'checksum': checksum,
+                'pdf_url': next((file['url'] for file in files if file.get('checksum') == checksum), None),
+                'cover_page_text': text,
+            }) + "\n")
+            self.store_file.flush()
+            self.stats['done'] += 1
+
+    def close_spider(self, spider):
+        # Wait for the OCR of the last PDFs
+        self.executor.shutdown(wait=True)
+        self.store_file.close()
+        logger.info(f"OCR of {self.stats['done']} PDFs saved to '{self.ocr_store}' ({self.stats['failed']} failed, "
+                    f"{self.stats['skipped']} skipped as already OCR-ed).")
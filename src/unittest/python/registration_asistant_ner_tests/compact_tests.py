@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import spacy
+from spacy.tokens import DocBin, Span
+from spacy.training import Example
+from spacy.util import fix_random_seed
+
+from registration_asistant_ner.compact import compact_models, load_bundle, verify_bundle
+
+
+class CompactTests(unittest.TestCase):
+    def test_compact_models(self):
+        # Arrange
+        fix_random_seed(0)
+        nlp = spacy.blank("es")
+        nlp.add_pipe("ner")
+        docs = []
+        for name in ["JUAN MAMANI", "ANA QUISPE", "LUIS CHOQUE", "ROSA FLORES"]:
+            doc = nlp.make_doc(f"UNIVERSIDAD MAYOR DE SAN ANDRES\nPOSTULANTE: {name}\nLA PAZ - BOLIVIA")
+            doc.ents = [Span(doc, 8, 10, "AUTHORS")]
+            docs.append(doc)
+        examples = [Example(nlp.make_doc(doc.text), doc) for doc in docs]
+        optimizer = nlp.initialize(lambda: examples)
+        for _ in range(5):
+            nlp.update(examples, sgd=optimizer)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            models_path = Path(tmp) / "trained_models"
+            (models_path / "authors_ner_model").mkdir(parents=True)
+            nlp.to_disk(models_path / "authors_ner_model" / "model-best")
+            test_data_path = Path(tmp) / "training_data"
+            test_data_path.mkdir()
+            DocBin(docs=docs).to_disk(test_data_path / "authors_test.spacy")
+            bundle_path = Path(tmp) / "bundle"
+
+            # Act
+            compact_models(models_path, bundle_path, model_names=["authors"])
+            bundle = load_bundle(bundle_path)
+            mismatches = verify_bundle(models_path, bundle_path, test_data_path)
+
+            # Assert
+            self.assertEqual(list(bundle.keys()), ["authors"])
+            self.assertIn("AUTHORS", bundle["authors"].get_pipe("ner").labels)
+            self.assertNotIn("MAMANI", bundle["authors"].vocab.strings)
+            self.assertEqual(mismatches, {"authors": 0})
+
+    def test_compact_models_does_not_overwrite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Arrange
+            models_path = Path(tmp) / "trained_models"
+            (models_path / "authors_ner_model").mkdir(parents=True)
+
+            # Act & Assert
+            with self.assertRaises(FileExistsError):
+                compact_models(models_path, models_path, model_names=["authors"])
+            self.assertTrue((models_path / "authors_ner_model").exists())
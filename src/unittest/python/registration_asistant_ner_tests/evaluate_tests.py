@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import spacy
+from spacy.tokens import DocBin, Span
+
+from registration_asistant_ner.evaluate import evaluate_model, evaluate_models
+
+
+class EvaluateTests(unittest.TestCase):
+    def test_evaluate_model(self):
+        # Arrange
+        nlp = spacy.blank("es")
+        ruler = nlp.add_pipe("entity_ruler")
+        ruler.add_patterns([
+            {"label": "AUTHORS", "pattern": "JUAN MAMANI"},
+            {"label": "AUTHORS", "pattern": "ANA QUISPE"},
+        ])
+
+        reference_1 = nlp.make_doc("POSTULANTE: JUAN MAMANI\nTUTOR: LUIS CHOQUE")
+        reference_1.ents = [Span(reference_1, 2, 4, "AUTHORS"), Span(reference_1, 7, 9, "ADVISORS")]
+        reference_2 = nlp.make_doc("POSTULANTE: ANA QUISPE")
+        reference_2.ents = [Span(reference_2, 2, 4, "AUTHORS")]
+
+        # Act
+        result = evaluate_model(nlp, [reference_1, reference_2], batch_size=1)
+
+        # Assert
+        self.assertEqual(result["docs"], 2)
+        self.assertEqual(result["tokens"], len(reference_1) + len(reference_2))
+        self.assertEqual(result["ents_per_type"]["AUTHORS"], {"p": 1.0, "r": 1.0, "f": 1.0})
+        self.assertEqual(result["ents_per_type"]["ADVISORS"]["r"], 0.0)
+        self.assertAlmostEqual(result["ents_p"], 1.0)
+        self.assertAlmostEqual(result["ents_r"], 2 / 3)
+        self.assertGreater(result["docs_per_sec"], 0)
+
+    def test_evaluate_models_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Arrange
+            models_path = Path(tmp)
+            for model_name in ["authors", "advisors"]:
+                nlp = spacy.blank("es")
+                nlp.add_pipe("entity_ruler").add_patterns([{"label": "AUTHORS", "pattern": "JUAN MAMANI"}])
+                (models_path / f"{model_name}_ner_model").mkdir()
+                nlp.to_disk(models_path / f"{model_name}_ner_model" / "model-best")
+                reference = nlp.make_doc("POSTULANTE: JUAN MAMANI")
+                reference.ents = [Span(reference, 2, 4, "AUTHORS")]
+                DocBin(docs=[reference]).to_disk(models_path / f"{model_name}_test.spacy")
+            # Memory used by this process, that must not be reported as used by the models
+            ballast = b"x" * (300 * 1024 * 1024)
+
+            # Act
+            results = evaluate_models(models_path, models_path, model_names=["authors", "advisors"])
+
+            # Assert
+            for model_name in ["authors", "advisors"]:
+                self.assertEqual(results[model_name]["ents_f"], 1.0)
+                self.assertLess(results[model_name]["peak_memory"], len(ballast))
+                self.assertGreaterEqual(results[model_name]["model_memory"], 0)
@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch
+
+import spacy
+from spacy.tokens import Span
+from spacy.training import Example
+from spacy.util import fix_random_seed
+
+from registration_asistant_ner.extractor import extract_from_pdf, parse_with_confidences
+
+PAGES = [
+    "UNIVERSIDAD MAYOR DE SAN ANDRES\nPOSTULANTE: JUAN MAMANI",
+    "DEDICATORIA\nTUTOR: LUIS CHOQUE",
+    "INDICE",
+]
+
+
+def get_page(pdf, start_page, end_page, **kwargs):
+    return PAGES[start_page]
+
+
+def build_model(label, pattern):
+    nlp = spacy.blank("es")
+    nlp.add_pipe("entity_ruler").add_patterns([{"label": label, "pattern": pattern}])
+    return nlp
+
+
+def train_model():
+    # A statistical NER that is sure of the names after 'POSTULANTE:' and unsure of names elsewhere
+    fix_random_seed(0)
+    nlp = spacy.blank("es")
+    nlp.add_pipe("ner")
+    examples = []
+    for name in ["JUAN MAMANI", "ANA QUISPE", "LUIS CHOQUE", "ROSA FLORES", "PEDRO CONDORI", "MARIA LIMACHI"]:
+        doc = nlp.make_doc(f"UNIVERSIDAD MAYOR DE SAN ANDRES\nPOSTULANTE: {name}\nLA PAZ")
+        doc.ents = [Span(doc, 8, 10, "AUTHORS")]
+        examples.append(Example(nlp.make_doc(doc.text), doc))
+    optimizer = nlp.initialize(lambda: examples)
+    for _ in range(30):
+        nlp.update(examples, sgd=optimizer)
+    return nlp
+
+
+NER_PAGES = [
+    "INDICE\nCAPITULO 1 JAVIER TICONA QUISPE",
+    "UNIVERSIDAD MAYOR DE SAN ANDRES\nPOSTULANTE: JAVIER TICONA\nLA PAZ",
+    "DEDICATORIA",
+]
+
+
+def get_ner_page(pdf, start_page, end_page, **kwargs):
+    return NER_PAGES[start_page]
+
+
+@patch("registration_asistant_ner.extractor.get_page_count", lambda pdf: len(PAGES))
+@patch("registration_asistant_ner.extractor.get_text_from_page_range", side_effect=get_page)
+class ExtractorTests(unittest.TestCase):
+    def setUp(self):
+        self.models = {
+            "authors": build_model("AUTHORS", "JUAN MAMANI"),
+            "advisors": build_model("ADVISORS", "LUIS CHOQUE"),
+        }
+
+    def test_extract_from_pdf_stops_when_all_fields_are_found(self, get_text_from_page_range):
+        # Act
+        result = extract_from_pdf("thesis.pdf", self.models, required_fields=["authors", "advisors"], max_pages=3)
+
+        # Assert
+        self.assertEqual(result["pages_processed"], 2)
+        self.assertEqual(get_text_from_page_range.call_count, 2)
+        self.assertEqual(result["missing_fields"], [])
+        self.assertEqual(result["fields"]["authors"], [{"text": "JUAN MAMANI", "confidence": 1.0, "page": 0}])
+        self.assertEqual(result["fields"]["advisors"], [{"text": "LUIS CHOQUE", "confidence": 1.0, "page": 1}])
+
+    def test_extract_from_pdf_respects_page_budget(self, get_text_from_page_range):
+        # Act
+        result = extract_from_pdf("thesis.pdf", self.models, required_fields=["authors", "advisors"], max_pages=1)
+
+        # Assert
+        self.assertEqual(result["pages_processed"], 1)
+        self.assertEqual(result["missing_fields"], ["advisors"])
+        self.assertEqual(result["fields"]["advisors"], [])
+
+
+class ConfidenceTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.nlp = train_model()
+
+    def test_parse_with_confidences(self):
+        # Act
+        doc, confidences = parse_with_confidences(self.nlp, NER_PAGES[0])
+        ents = [(ent.start, ent.end, ent.label_) for ent in doc.ents]
+
+        # Assert
+        self.assertEqual(len(ents), 1)
+        self.assertLess(confidences[ents[0]], 0.8)
+        self.assertEqual(set(confidences.keys()), set(ents))
+
+    @patch("registration_asistant_ner.extractor.get_page_count", lambda pdf: len(NER_PAGES))
+    @patch("registration_asistant_ner.extractor.get_text_from_page_range", side_effect=get_ner_page)
+    def test_extract_from_pdf_reads_next_page_on_low_confidence(self, get_text_from_page_range):
+        # Act
+        result = extract_from_pdf("thesis.pdf", {"authors": self.nlp}, required_fields=["authors"], threshold=0.8)
+
+        # Assert
+        self.assertEqual(result["pages_processed"], 2)
+        self.assertEqual(result["missing_fields"], [])
+        first_page, second_page = result["fields"]["authors"]
+        self.assertEqual(first_page["page"], 0)
+        self.assertLess(first_page["confidence"], 0.8)
+        self.assertEqual(second_page["text"], "JAVIER TICONA")
+        self.assertGreaterEqual(second_page["confidence"], 0.8)
@@ -0,0 +1,108 @@
+import random
+import unittest
+
+import pandas as pd
+
+from registration_asistant_ner.training_data.deduplicator import drop_duplicated_files, find_near_duplicates, \
+    simhash, drop_near_duplicates
+
+COVER_PAGE = """UNIVERSIDAD MAYOR DE SAN ANDRES
+FACULTAD DE CIENCIAS PURAS Y NATURALES
+CARRERA DE INFORMATICA
+TESIS DE GRADO
+SISTEMA DE INFORMACION PARA EL CONTROL DE INVENTARIOS DE LA BIBLIOTECA CENTRAL
+PARA OPTAR AL TITULO DE LICENCIATURA EN INFORMATICA
+MENCION INGENIERIA DE SISTEMAS INFORMATICOS
+POSTULANTE: JUAN CARLOS MAMANI QUISPE
+TUTOR: LIC. LUIS ALBERTO CHOQUE FLORES
+REVISOR: LIC. ANA MARIA CONDORI APAZA
+LA PAZ - BOLIVIA
+2015"""
+
+
+class DeduplicatorTests(unittest.TestCase):
+    def test_drop_duplicated_files(self):
+        # Arrange
+        df = pd.DataFrame({
+            "files": [
+                [{"url": "https://a/1.pdf", "checksum": "aaa"}, {"url": "https://a/1/mets.xml", "checksum": "x1"}],
+                [{"url": "https://a/2.pdf", "checksum": "bbb"}, {"url": "https://a/2/mets.xml", "checksum": "x2"}],
+                [{"url": "https://b/3.pdf", "checksum": "aaa"}, {"url": "https://b/3/mets.xml", "checksum": "x3"}],
+                [{"url": "https://a/4/mets.xml", "checksum": "x4"}],
+                [{"url": "https://a/5/mets.xml", "checksum": "x5"}],
+            ]
+        })
+
+        # Act
+        deduplicated_df = drop_duplicated_files(df)
+
+        # Assert
+        self.assertEqual(deduplicated_df.index.to_list(), [0, 1, 3, 4])
+
+    def test_simhash(self):
+        # Arrange
+        ocr_variant = COVER_PAGE.replace("INVENTARIOS", "INVENTARI0S")
+
+        # Act
+        distance = bin(simhash(COVER_PAGE) ^ simhash(ocr_variant)).count("1")
+
+        # Assert
+        self.assertEqual(simhash(COVER_PAGE), simhash(COVER_PAGE))
+        self.assertLessEqual(distance, 3)
+
+    def test_find_near_duplicates(self):
+        # Arrange
+        texts = [
+            COVER_PAGE,
+            COVER_PAGE.replace("\n", "  \n"),
+            COVER_PAGE.replace("SISTEMA DE INFORMACION PARA EL CONTROL DE INVENTARIOS DE LA BIBLIOTECA CENTRAL",
+                               "ANALISIS DEL IMPACTO DE LAS POLITICAS PUBLICAS EN LA EDUCACION RURAL DEL ALTIPLANO")
+                      .replace("JUAN CARLOS MAMANI QUISPE", "ROSA ELENA TICONA HUANCA"),
+            COVER_PAGE,
+        ]
+
+        # Act
+        duplicated = find_near_duplicates(texts, max_distance=3)
+
+        # Assert
+        self.assertEqual(duplicated, [False, True, False, True])
+
+    def test_find_near_duplicates_keeps_different_theses(self):
+        # Arrange
+        # Many theses of the same program, whose cover pages only differ in the title, names and year
+        rng = random.Random(0)
+        given_names = ["JUAN", "ANA", "LUIS", "ROSA", "PEDRO", "MARIA", "JORGE", "ELENA", "CARLOS", "SONIA"]
+        surnames = ["MAMANI", "QUISPE", "CHOQUE", "FLORES", "CONDORI", "TICONA", "APAZA", "HUANCA", "LIMACHI", "COPA"]
+        title_words = ["SISTEMA", "ANALISIS", "MODELO", "IMPACTO", "CONTROL", "GESTION", "EVALUACION", "DE", "LA",
+                       "EL", "EN", "PARA", "LOS", "DEL", "RED", "DATOS", "AGUA", "SUELO", "EDUCACION"]
+        texts = [
+            COVER_PAGE
+            .replace("SISTEMA DE INFORMACION PARA EL CONTROL DE INVENTARIOS DE LA BIBLIOTECA CENTRAL",
+                     " ".join(rng.choice(title_words) for _ in range(rng.randint(6, 12))))
+            .replace("JUAN CARLOS MAMANI QUISPE", f"{rng.choice(given_names)} {rng.choice(surnames)} "
+                                                  f"{rng.choice(surnames)}")
+            .replace("LUIS ALBERTO CHOQUE FLORES", f"{rng.choice(given_names)} {rng.choice(surnames)}")
+            .replace("2015", str(rng.randint(2010, 2023)))
+            for _ in range(500)
+        ]
+
+        # Act
+        duplicated = find_near_duplicates(texts)
+
+        # Assert
+        self.assertEqual(sum(duplicated), 0)
+
+    def test_drop_near_duplicates(self):
+        # Arrange
+        df = pd.DataFrame({
+            "title": ["SISTEMA DE INFORMACION", "SISTEMA DE INFORMACION", "OTRA TESIS"],
+            "authors": [["JUAN MAMANI"], ["JUAN MAMANI"], ["ANA QUISPE"]],
+            "cover_page_text": [COVER_PAGE, COVER_PAGE.replace("INVENTARIOS", "INVENTARI0S"), COVER_PAGE],
+        })
+
+        # Act
+        deduplicated_df = drop_near_duplicates(df)
+
+        # Assert
+        # The third record has the same cover page text, but it is a different thesis
+        self.assertEqual(deduplicated_df.index.to_list(), [0, 2])
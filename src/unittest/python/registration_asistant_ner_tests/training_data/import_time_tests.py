@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import unittest
+
+MODULES = [
+    "registration_asistant_ner.training_data",
+    "registration_asistant_ner.training_data.data_loader",
+    "registration_asistant_ner.training_data.data_preparer",
+    "registration_asistant_ner.training_data.pdf_reader",
+]
+
+# Heavy dependencies that must only be imported on first use
+LAZY_MODULES = ["pandas", "pandarallel", "spacy", "cv2", "pymupdf", "pytesseract"]
+
+# Budget for importing all the modules above, in microseconds. Importing pandas and spaCy alone takes over a second.
+IMPORT_TIME_BUDGET = 500_000
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+class ImportTimeTests(unittest.TestCase):
+    def test_heavy_dependencies_are_not_imported(self):
+        # Act
+        result = run_python("-c", f"import sys; import {', '.join(MODULES)}; print(' '.join(sys.modules))")
+
+        # Assert
+        imported = {module.split(".")[0] for module in result.stdout.split()}
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, imported)
+
+    def test_import_time_budget(self):
+        # Act
+        result = run_python("-X", "importtime", "-c", f"import {', '.join(MODULES)}")
+
+        # Assert
+        # Each line is 'import time: <self us> | <cumulative us> | <module>', nested imports are indented
+        total = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            _, cumulative, name = line.split("|")
+            if not name.startswith(" ") or name.startswith("  "):
+                continue
+            if name.strip().startswith("registration_asistant_ner"):
+                total += int(cumulative)
+        self.assertGreater(total, 0)
+        self.assertLess(total, IMPORT_TIME_BUDGET)
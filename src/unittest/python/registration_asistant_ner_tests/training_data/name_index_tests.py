@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from registration_asistant_ner.training_data.data_preparer import prepare_data, generate_doc_with_entities
+from registration_asistant_ner.training_data.name_index import NameIndex, generate_name_variants
+
+
+class NameIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.name_index = NameIndex()
+        self.name_index.add_names([
+            "Mamani Quispe, Juan Carlos",
+            "Mamani Quispe, Juan Carlos",
+            "Mamani Flores, Jorge",
+            "Céspedes, Luis",
+        ])
+
+    def test_generate_name_variants(self):
+        # Act
+        variants = generate_name_variants("Mamani Quispe, Juan Carlos")
+
+        # Assert
+        self.assertIn("JUAN CARLOS MAMANI QUISPE", variants)
+        self.assertIn("MAMANI QUISPE JUAN CARLOS", variants)
+        self.assertIn("JUAN MAMANI", variants)
+        self.assertIn("J. C. MAMANI QUISPE", variants)
+        self.assertEqual(len(variants), len(set(variants)))
+
+    def test_lookup(self):
+        # Act
+        by_initials = self.name_index.lookup("J. C. Mamani Quispe")
+        ambiguous = self.name_index.lookup("J. Mamani")
+        without_accents = self.name_index.lookup("LUIS CESPEDES")
+
+        # Assert
+        self.assertEqual(by_initials, ["MAMANI QUISPE, JUAN CARLOS"])
+        self.assertEqual(ambiguous, ["MAMANI QUISPE, JUAN CARLOS", "MAMANI FLORES, JORGE"])
+        self.assertEqual(without_accents, ["CESPEDES, LUIS"])
+        self.assertEqual(self.name_index.lookup("Ana Condori"), [])
+
+    def test_link(self):
+        # Act
+        linked = self.name_index.link("LIC. JUAN MAMANI QUISPE")
+
+        # Assert
+        self.assertEqual(linked, "MAMANI QUISPE, JUAN CARLOS")
+        self.assertEqual(self.name_index.names[linked]["frequency"], 2)
+
+    def test_to_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Act
+            self.name_index.to_disk(Path(tmp) / "name_index.json")
+            loaded = NameIndex.from_disk(Path(tmp) / "name_index.json")
+
+        # Assert
+        self.assertEqual(loaded.names, self.name_index.names)
+        self.assertEqual(loaded.link("Jorge Mamani"), "MAMANI FLORES, JORGE")
+
+    def test_generate_doc_with_entities_with_name_index(self):
+        # Arrange
+        self.name_index.add_names(["Choque Flores, Luis Alberto"])
+        data = pd.DataFrame({
+            "authors": [["Mamani Quispe, Juan Carlos"]],
+            "advisors": [["Choque Flores, Luis Alberto"]],
+            "title": ["Sistema de control"],
+            "abstract": [""],
+            "subjects": [[]],
+            "issued": ["2021-01-01"],
+            "cover_page_text": ["UNIVERSIDAD MAYOR DE SAN ANDRES\nPOSTULANTE: JUAN CARLOS MAMANI QUISPE\n"
+                                "TUTOR: LIC. LUIS ALBERTO CHOQUE FLORES\nLA PAZ - BOLIVIA"],
+            "breadcrumb": [["DSpace Home", "Facultad de Tecnología", "Carrera Electrónica y Telecomunicaciones",
+                            "Proyectos de Grado", "View Item"]],
+        })
+
+        # Act
+        row = prepare_data(data, name_index=self.name_index).to_dict(orient="records")[0]
+        doc = generate_doc_with_entities(row, "cover_page_text", ["authors", "advisors"])
+
+        # Assert
+        # The variants of each name overlap, only the full names must be labelled
+        self.assertEqual([(ent.text, ent.label_) for ent in doc.ents],
+                         [("JUAN CARLOS MAMANI QUISPE", "AUTHORS"), ("LUIS ALBERTO CHOQUE FLORES", "ADVISORS")])
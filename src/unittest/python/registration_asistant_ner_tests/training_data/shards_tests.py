@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import spacy
+from spacy.tokens import Span
+
+from registration_asistant_ner.training_data.shards import write_shard, ShardReader, create_shard_corpus
+
+
+class ShardsTests(unittest.TestCase):
+    def setUp(self):
+        self.nlp = spacy.blank("es")
+        self.docs = []
+        self.metadata = []
+        for i, (faculty, year, label) in enumerate([
+            ("FACULTAD DE TECNOLOGIA", "2012", "AUTHORS"),
+            ("FACULTAD DE TECNOLOGIA", "2018", "ADVISORS"),
+            ("FACULTAD DE DERECHO", "2015", "AUTHORS"),
+            ("FACULTAD DE DERECHO", "2020", "AUTHORS"),
+            ("FACULTAD DE TECNOLOGIA", "2021", "AUTHORS"),
+        ]):
+            doc = self.nlp.make_doc(f"TESIS {i}\nJUAN MAMANI")
+            doc.ents = [Span(doc, 3, 5, label)]
+            self.docs.append(doc)
+            self.metadata.append({"handle": f"123456789/{i}", "faculty": faculty, "year": year})
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "test.shard"
+        write_shard(self.path, self.docs, self.metadata)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get_doc(self):
+        # Act
+        with ShardReader(self.path) as reader:
+            doc = reader.get_doc(3, self.nlp)
+            entry = reader.index[3]
+
+        # Assert
+        self.assertEqual(doc.text, "TESIS 3\nJUAN MAMANI")
+        self.assertEqual([(ent.text, ent.label_) for ent in doc.ents], [("JUAN MAMANI", "AUTHORS")])
+        self.assertEqual(entry["handle"], "123456789/3")
+        self.assertEqual(entry["labels"], ["AUTHORS"])
+
+    def test_filter(self):
+        with ShardReader(self.path) as reader:
+            # Act
+            by_label = reader.filter(labels=["ADVISORS"])
+            by_faculty_and_year = reader.filter(faculty="FACULTAD DE TECNOLOGIA", min_year=2015)
+
+        # Assert
+        self.assertEqual(by_label, [1])
+        self.assertEqual(by_faculty_and_year, [1, 4])
+
+    def test_split(self):
+        with ShardReader(self.path) as reader:
+            # Act
+            train, dev = reader.split(dev_ratio=0.5, stratify_by="faculty")
+
+            # Assert
+            self.assertEqual(sorted(train + dev), [0, 1, 2, 3, 4])
+            self.assertEqual(len([i for i in dev if reader.index[i]["faculty"] == "FACULTAD DE DERECHO"]), 1)
+
+    def test_create_shard_corpus(self):
+        # Arrange
+        corpus = create_shard_corpus(self.path, labels=["AUTHORS"])
+
+        # Act
+        examples = list(corpus(self.nlp))
+
+        # Assert
+        self.assertEqual(len(examples), 4)
+        self.assertEqual([ent.label_ for ent in examples[0].reference.ents], ["AUTHORS"])
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from textwrap import dedent
+
+from registration_asistant_ner.training_data.data_loader import load_ocr_store
+from registration_asistant_ner.training_data.spiders.pipelines import OcrPipeline
+
+RESOURCES = Path(__file__).parent.parent / "resources" / "dspace_files" / "full"
+METS_FILE = RESOURCES / "52241d5f70c6994e84aa4a13d1d41d5597bceb50.xml"
+PDF_FILE = RESOURCES / "daa71cdf8d40cde3a23d9c9cbfdcd97fdf1bd498.pdf"
+
+CRAWL_SCRIPT = dedent("""
+    import sys
+    from scrapy.crawler import CrawlerProcess
+    from registration_asistant_ner.training_data.spiders.dspace import DSpaceSpider
+
+    community_url, files_store, ocr_store = sys.argv[1:4]
+    process = CrawlerProcess(settings={
+        "ITEM_PIPELINES": {
+            "scrapy.pipelines.files.FilesPipeline": 1,
+            "registration_asistant_ner.training_data.spiders.pipelines.OcrPipeline": 300,
+        },
+        "FILES_STORE": files_store,
+        "OCR_STORE": ocr_store,
+        "OCR_WORKERS": 2,
+        "OCR_FUNCTION": "registration_asistant_ner_tests.training_data.spiders.pipelines_tests.fake_ocr",
+    })
+    process.crawl(DSpaceSpider, community_url=community_url)
+    process.start()
+""")
+
+
+def fake_ocr(pdf_file: str) -> str:
+    # Tesseract is not needed to test the handoff from the crawler to the OCR workers
+    return f"COVER PAGE OF {Path(pdf_file).name}" if os.path.exists(pdf_file) else None
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves a DSpace community with two records whose METS files point to the same PDF.
+    """
+    pages = {
+        "/xmlui/handle/123456789/1/recent-submissions": (
+            "text/html",
+            b'<html><body>'
+            b'<div class="artifact-description"><a href="/xmlui/handle/123456789/957">Record 1</a></div>'
+            b'<div class="artifact-description"><a href="/xmlui/handle/123456789/958">Record 2</a></div>'
+            b'</body></html>'
+        ),
+        "/xmlui/handle/123456789/957": (
+            "text/html",
+            b'<html><body><div id="aspect_artifactbrowser_ItemViewer_div_item-view">'
+            b'<!-- External Metadata URL: cocoon://metadata/handle/123456789/957/mets.xml-->'
+            b'</div></body></html>'
+        ),
+        "/xmlui/handle/123456789/958": (
+            "text/html",
+            b'<html><body><div id="aspect_artifactbrowser_ItemViewer_div_item-view">'
+            b'<!-- External Metadata URL: cocoon://metadata/handle/123456789/958/mets.xml-->'
+            b'</div></body></html>'
+        ),
+        "/xmlui/metadata/handle/123456789/957/mets.xml": ("text/xml", METS_FILE.read_bytes()),
+        "/xmlui/metadata/handle/123456789/958/mets.xml": (
+            "text/xml", METS_FILE.read_bytes().replace(b"/123456789/957/R-18.pdf", b"/123456789/958/R-18.pdf")
+        ),
+        "/xmlui/bitstream/handle/123456789/957/R-18.pdf": ("application/pdf", PDF_FILE.read_bytes()),
+        "/xmlui/bitstream/handle/123456789/958/R-18.pdf": ("application/pdf", PDF_FILE.read_bytes()),
+    }
+
+    def do_GET(self):
+        page = self.pages.get(self.path.split("?")[0])
+        if page is None:
+            self.send_error(404)
+            return
+        content_type, body = page
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OcrPipelineTests(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_ocr_pipeline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Arrange
+            community_url = f"http://127.0.0.1:{self.server.server_port}/xmlui/handle/123456789/1/recent-submissions"
+            ocr_store = Path(tmp) / "ocr_store.jsonl"
+
+            # Act
+            # The crawl runs in another process, as the Twisted reactor can't be restarted
+            subprocess.run([sys.executable, "-c", CRAWL_SCRIPT, community_url, str(Path(tmp) / "files"),
+                            str(ocr_store)], env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+                           check=True, capture_output=True, timeout=120)
+            ocr_texts = load_ocr_store(ocr_store)
+
+            # Assert
+            # Both records have the same PDF, so it is only OCR-ed once
+            checksum = hashlib.md5(PDF_FILE.read_bytes()).hexdigest()
+            self.assertEqual(list(ocr_texts.keys()), [checksum])
+            self.assertRegex(ocr_texts[checksum], r"^COVER PAGE OF [0-9a-f]{40}(\.pdf)?$")
+
+    def test_ocr_pipeline_logs_failures(self):
+        # Arrange
+        pipeline = OcrPipeline(files_store="files", ocr_store="ocr_store.jsonl")
+        future = Future()
+        future.set_exception(RuntimeError("Tesseract failed"))
+
+        # Act
+        with self.assertLogs("registration_asistant_ner.training_data.spiders.pipelines", level="ERROR") as logs:
+            pipeline._store(future, "abc123", Path("files/full/abc.pdf"), [])
+
+        # Assert
+        self.assertEqual(pipeline.stats["failed"], 1)
+        self.assertIn("abc123", logs.output[0])
+        self.assertIn("abc.pdf", logs.output[0])
+        self.assertIn("Tesseract failed", logs.output[0])